@@ -111,6 +111,12 @@ if character:
     print(encode(character).decode())
 
 
+# # export json directly, reusing one buffer for many responses
+# buffer = bytearray()
+# if index.get_character_info_json(basic, buffer) is not None:
+#     print(buffer.decode())
+
+
 # # export dict
 # if character:
 #     from msgspec import to_builtins
@@ -0,0 +1,13 @@
+from pathlib import Path
+
+from starrailres import Index
+
+# replace with index folder
+folder = Path("index") / "en"
+
+# build step: write compiled index next to json files
+Index(folder).compile(folder / "index.msgpack")
+
+# load from compiled index, rebuilt automatically when json files change
+index = Index(folder, compiled=folder / "index.msgpack")
+print(index.get_avatar_info("200001"))
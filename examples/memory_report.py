@@ -0,0 +1,44 @@
+import sys
+from pathlib import Path
+
+from msgspec import Struct
+
+from starrailres import Index
+from starrailres.index import index_tables
+
+
+def deep_size(value, seen: set) -> int:
+    # objects shared with tables counted before are not counted again
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, Struct):
+        size += sum(deep_size(getattr(value, i), seen) for i in value.__struct_fields__)
+    elif isinstance(value, (list, tuple)):
+        size += sum(deep_size(i, seen) for i in value)
+    elif isinstance(value, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in value.items())
+    # strings, numbers and arrays hold their data inline
+    return size
+
+
+def report(index: Index) -> dict:
+    seen: set = set()
+    return {name: deep_size(getattr(index, name), seen) for name in index_tables}
+
+
+# replace with index folder
+folder = Path("index") / "en"
+default = report(Index(folder))
+compact = report(Index(folder, compact_tables=True))
+
+print(f"{'table':<24}{'default':>12}{'compact':>12}{'saved':>8}")
+for name in index_tables:
+    saved = 1 - compact[name] / default[name] if default[name] else 0
+    print(f"{name:<24}{default[name]:>12,}{compact[name]:>12,}{saved:>8.0%}")
+total, total_compact = sum(default.values()), sum(compact.values())
+print(
+    f"{'total':<24}{total:>12,}{total_compact:>12,}"
+    f"{1 - total_compact / total:>8.0%}"
+)
@@ -0,0 +1,77 @@
+import time
+from pathlib import Path
+
+from starrailres import (
+    CharacterBasicInfo,
+    Index,
+    LevelInfo,
+    LightConeBasicInfo,
+    RelicBasicInfo,
+    SubAffixBasicInfo,
+)
+from starrailres.index import character_sections
+
+# replace with index folder
+index = Index(Path("index") / "en")
+
+basic = CharacterBasicInfo(
+    id="1102",
+    rank=0,
+    level=70,
+    promotion=5,
+    skill_tree_levels=[
+        LevelInfo(id="1102001", level=2),
+        LevelInfo(id="1102002", level=5),
+        LevelInfo(id="1102003", level=6),
+        LevelInfo(id="1102004", level=5),
+    ],
+    light_cone=LightConeBasicInfo(id="23001", rank=1, level=70, promotion=5),
+    relics=[
+        RelicBasicInfo(
+            id="61081",
+            level=12,
+            main_affix_id="1",
+            sub_affix_info=[
+                SubAffixBasicInfo(id="2", cnt=3, step=1),
+                SubAffixBasicInfo(id="3", cnt=1, step=0),
+                SubAffixBasicInfo(id="6", cnt=3, step=3),
+                SubAffixBasicInfo(id="9", cnt=1, step=2),
+            ],
+        ),
+        RelicBasicInfo(
+            id="61082",
+            level=13,
+            main_affix_id="1",
+            sub_affix_info=[
+                SubAffixBasicInfo(id="5", cnt=2, step=4),
+                SubAffixBasicInfo(id="6", cnt=1, step=1),
+                SubAffixBasicInfo(id="7", cnt=1, step=2),
+                SubAffixBasicInfo(id="10", cnt=3, step=2),
+            ],
+        ),
+    ],
+)
+
+calls = 5000
+
+
+def bench(**options) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        index.get_character_info(basic, **options)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+# warm up lazily built tables and caches
+bench()
+
+full = bench()
+print(f"{'full':<24}{full:8.1f} us/call")
+print(f"{'numeric only':<24}{bench(numeric_only=True):8.1f} us/call")
+print(f"{'no sections':<24}{bench(sections=[]):8.1f} us/call")
+for section in sorted(character_sections):
+    print(f"{section:<24}{bench(sections=[section]):8.1f} us/call")
+print(
+    f"{'additions, numeric only':<24}"
+    f"{bench(sections=['additions'], numeric_only=True):8.1f} us/call"
+)
@@ -0,0 +1,43 @@
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from starrailres import CharacterBasicInfo, Index, LevelInfo, LightConeBasicInfo
+
+# replace with index folder
+index = Index(Path("index") / "en", frozen=True)
+
+basic = CharacterBasicInfo(
+    id="1102",
+    rank=0,
+    level=70,
+    promotion=5,
+    skill_tree_levels=[
+        LevelInfo(id="1102001", level=2),
+        LevelInfo(id="1102002", level=5),
+        LevelInfo(id="1102003", level=6),
+        LevelInfo(id="1102004", level=5),
+    ],
+    light_cone=LightConeBasicInfo(id="23001", rank=1, level=70, promotion=5),
+)
+
+calls = 5000
+
+
+def work(n: int) -> None:
+    for _ in range(n):
+        index.get_character_info(basic)
+
+
+# warm up lazily built tables and caches
+work(100)
+
+gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+print(f"GIL enabled: {gil}")
+for threads in (1, 2, 4, 8):
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        start = time.perf_counter()
+        list(executor.map(work, [calls // threads] * threads))
+        elapsed = time.perf_counter() - start
+    print(f"{threads} threads: {calls / elapsed:.0f} calls/s")
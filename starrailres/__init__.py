@@ -1 +1,2 @@
 from .index import *
+from .registry import IndexRegistry
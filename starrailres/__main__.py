@@ -0,0 +1,98 @@
+import argparse
+import sys
+from contextlib import nullcontext
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+from .batch import dump_chunk_infos, dump_worker_chunk_infos, get_chunks, map_chunks
+from .index import Index
+
+
+def convert(
+    index: Index,
+    input: BinaryIO,
+    output: BinaryIO,
+    workers: Optional[int] = None,
+    chunksize: int = 256,
+    max_pending: Optional[int] = None,
+) -> int:
+    """
+    Convert json lines of character basic infos to json lines of character infos.
+    Returns number of failed lines and lines of unknown characters, which are
+    reported to stderr.
+    """
+    if max_pending is not None and max_pending < 1:
+        raise ValueError("Pending chunk limit must be positive!")
+    chunks = get_chunks(input, chunksize)
+    results: Iterator[Tuple[bytes, List[Tuple[int, str]]]]
+    if workers is None:
+        # one buffer per call, chunks are converted one after another
+        buffer = bytearray()
+        results = (dump_chunk_infos(index, chunk, buffer) for chunk in chunks)
+        return write_results(results, output)
+    with index.get_worker_pool(workers) as executor:
+        results = map_chunks(
+            executor,
+            dump_worker_chunk_infos,
+            chunks,
+            max_pending if max_pending is not None else 2 * workers,
+        )
+        return write_results(results, output)
+
+
+def write_results(
+    results: Iterator[Tuple[bytes, List[Tuple[int, str]]]], output: BinaryIO
+) -> int:
+    failed = 0
+    for lines, errors in results:
+        output.write(lines)
+        for number, message in errors:
+            print(f"line {number}: {message}", file=sys.stderr)
+        failed += len(errors)
+    output.flush()
+    return failed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m starrailres",
+        description="Convert json lines of character basic infos to character infos.",
+    )
+    parser.add_argument("index", type=Path, help="index folder")
+    parser.add_argument(
+        "input", nargs="?", type=Path, help="json lines file, stdin by default"
+    )
+    parser.add_argument("--compiled", type=Path, help="compiled index file")
+    parser.add_argument("--workers", type=int, help="number of worker processes")
+    parser.add_argument(
+        "--chunksize", type=int, default=256, help="lines per chunk (default: 256)"
+    )
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        help="chunks in flight with workers (default: twice the workers)",
+    )
+    args = parser.parse_args(argv)
+    if args.chunksize < 1:
+        parser.error("chunk size must be positive")
+    if args.workers is not None and args.workers < 1:
+        parser.error("number of workers must be positive")
+    if args.max_pending is not None and args.max_pending < 1:
+        parser.error("pending chunk limit must be positive")
+    index = Index(args.index, compiled=args.compiled)
+    with (
+        open(args.input, "rb") if args.input else nullcontext(sys.stdin.buffer)
+    ) as input:
+        failed = convert(
+            index,
+            input,
+            sys.stdout.buffer,
+            args.workers,
+            args.chunksize,
+            args.max_pending,
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+import asyncio
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Optional, TypeVar, Union
+
+from .index import Index
+from .models.info import (
+    CharacterBasicInfo,
+    CharacterInfo,
+    LightConeBasicInfo,
+    LightConeInfo,
+    RelicBasicInfo,
+    RelicInfo,
+)
+from .utils import ArchivePath
+
+T = TypeVar("T")
+
+
+class AsyncIndex:
+    """
+    Asyncio facade of an index, running loading and info creation on an executor.
+
+    At most `limit` calls run at once, others wait for a free slot in call order.
+    Cancelling a call which has not started yet removes it from the executor, a
+    running call finishes in the background and keeps its slot until then. The
+    executor should be a thread pool, the index is shared with it. With coalescing
+    enabled on the index, calls for the same character build share one call, which
+    is not cancelled with one caller. Methods and tables of the index are available
+    on the facade directly.
+    """
+
+    def __init__(
+        self,
+        index: Index,
+        executor: Optional[Executor] = None,
+        limit: Optional[int] = None,
+    ) -> None:
+        """
+        Without `executor` a thread pool of `limit` threads is created, which is
+        shut down on `close`.
+        """
+        if limit is not None and limit < 1:
+            raise ValueError("Concurrency limit must be positive!")
+        self.index = index
+        self.own_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=limit)
+        self.limit = limit
+        # created on first use, bound to the running loop
+        self.semaphore: Optional[asyncio.Semaphore] = None
+
+    @classmethod
+    async def create(
+        cls,
+        folder: Union[Path, ArchivePath],
+        executor: Optional[Executor] = None,
+        limit: Optional[int] = None,
+        **options: Any,
+    ) -> "AsyncIndex":
+        """
+        Load index from folder on the executor, `options` are passed to `Index`.
+        """
+        own_executor = executor is None
+        executor = executor or ThreadPoolExecutor(max_workers=limit)
+        try:
+            index = await asyncio.wrap_future(
+                executor.submit(partial(Index, folder, **options))
+            )
+        except BaseException:
+            if own_executor:
+                executor.shutdown(wait=False)
+            raise
+        self = cls(index, executor, limit)
+        self.own_executor = own_executor
+        return self
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for missing attributes, delegate to index
+        if "index" not in self.__dict__:
+            raise AttributeError(name)
+        return getattr(self.index, name)
+
+    async def __aenter__(self) -> "AsyncIndex":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Shut down own executor, without waiting for running calls.
+        """
+        if self.own_executor:
+            self.executor.shutdown(wait=False)
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Run `fn` with `args` on the executor within the concurrency limit.
+        """
+        if self.limit is None:
+            return await asyncio.wrap_future(self.executor.submit(fn, *args))
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.limit)
+        semaphore = self.semaphore
+        await semaphore.acquire()
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            semaphore.release()
+            raise
+        loop = asyncio.get_running_loop()
+
+        def release(_: "Future[T]") -> None:
+            # the call may finish on an executor thread
+            try:
+                loop.call_soon_threadsafe(semaphore.release)
+            except RuntimeError:
+                pass  # loop already closed
+
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    async def get_character_info(
+        self, basic: CharacterBasicInfo
+    ) -> Optional[CharacterInfo]:
+        flight = self.index.single_flight
+        if flight is None:
+            return await self.run(self.index.get_character_info, basic)
+        # coalesce on the loop, without taking an executor slot per waiting call
+        key, call = self.index.character_info_call(basic)
+        return await flight.do_async(key, partial(self.run, call))
+
+    async def get_light_cone_info(
+        self, basic: LightConeBasicInfo
+    ) -> Optional[LightConeInfo]:
+        return await self.run(self.index.get_light_cone_info, basic)
+
+    async def get_relic_info(self, basic: RelicBasicInfo) -> Optional[RelicInfo]:
+        return await self.run(self.index.get_relic_info, basic)
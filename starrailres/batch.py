@@ -0,0 +1,154 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, as_completed, wait
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from msgspec import json
+from msgspec.msgpack import Encoder
+
+from .models.info import CharacterBasicInfo, CharacterInfo
+
+T = TypeVar("T")
+
+# result of one item, exception raised by a failed item is returned in its place
+BatchResult = Union[CharacterInfo, None, Exception]
+
+# index of this worker process, loaded once by `init_worker`
+worker_index: Any = None
+
+# infos are sent back encoded, frozen info types can not be pickled
+worker_encoder = Encoder()
+
+# json lines of all chunks, encoder and decoder are safe to share between threads
+line_decoder = json.Decoder(CharacterBasicInfo)
+line_encoder = json.Encoder()
+
+# reused for chunks of this worker process, which runs one chunk at a time
+worker_buffer = bytearray()
+
+
+def init_worker(cls: type, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> None:
+    global worker_index
+    worker_index = cls(*args, **kwargs)
+
+
+def get_chunk_infos(index: Any, chunk: List[CharacterBasicInfo]) -> List[BatchResult]:
+    results: List[BatchResult] = []
+    for basic in chunk:
+        try:
+            results.append(index.get_character_info(basic))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def encode_chunk_infos(
+    chunk: Tuple[int, List[CharacterBasicInfo]],
+) -> Tuple[int, List[Union[bytes, None, Exception]]]:
+    """
+    Get encoded character infos of chunk with worker index.
+    """
+    start, basics = chunk
+    infos = get_chunk_infos(worker_index, basics)
+    return start, [
+        worker_encoder.encode(i) if isinstance(i, CharacterInfo) else i for i in infos
+    ]
+
+
+def dump_chunk_infos(
+    index: Any,
+    chunk: Tuple[int, List[bytes]],
+    buffer: Optional[bytearray] = None,
+) -> Tuple[bytes, List[Tuple[int, str]]]:
+    """
+    Convert json lines of basic infos to json lines of infos, `null` for unknown
+    characters or failed lines and nothing for blank lines. Returns the lines and
+    errors, unknown characters included, with their line numbers. `buffer` is
+    reused for encoding, it must not be used by another call at the same time.
+    """
+    if buffer is None:
+        buffer = bytearray()
+    start, lines = chunk
+    errors = []
+    offset = 0
+    for number, line in enumerate(lines, start + 1):
+        if line.isspace():
+            continue
+        try:
+            basic = line_decoder.decode(line)
+            info = index.get_character_info(basic)
+            if info is None:
+                errors.append((number, f"Unknown character: {basic.id}"))
+        except Exception as e:
+            info = None
+            errors.append((number, str(e)))
+        line_encoder.encode_into(info, buffer, offset)
+        buffer.append(10)  # newline
+        offset = len(buffer)
+    return bytes(buffer[:offset]), errors
+
+
+def dump_worker_chunk_infos(
+    chunk: Tuple[int, List[bytes]],
+) -> Tuple[bytes, List[Tuple[int, str]]]:
+    return dump_chunk_infos(worker_index, chunk, worker_buffer)
+
+
+def get_chunks(items: Iterable[T], chunksize: int) -> Iterator[Tuple[int, List[T]]]:
+    """
+    Split items into chunks with position of their first item.
+    """
+    it = iter(items)
+    start = 0
+    while True:
+        chunk = list(islice(it, chunksize))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def map_chunks(
+    executor: Executor,
+    fn: Callable[[Any], T],
+    chunks: Iterable[Any],
+    max_pending: int,
+    ordered: bool = True,
+) -> Iterator[T]:
+    """
+    Map `fn` over chunks on executor, in submission or completion order.
+
+    At most `max_pending` chunks are submitted and not yet consumed, so chunks are
+    read from the iterable only as fast as results are consumed.
+    """
+    if ordered:
+        queue: Deque["Future[T]"] = deque()
+        for chunk in chunks:
+            if len(queue) >= max_pending:
+                yield queue.popleft().result()
+            queue.append(executor.submit(fn, chunk))
+        while queue:
+            yield queue.popleft().result()
+        return
+    pending: Set["Future[T]"] = set()
+    for chunk in chunks:
+        if len(pending) >= max_pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+        pending.add(executor.submit(fn, chunk))
+    for future in as_completed(pending):
+        yield future.result()
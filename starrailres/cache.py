@@ -0,0 +1,225 @@
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import wraps
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from msgspec import Struct
+from msgspec.msgpack import Decoder, Encoder
+
+from .models.info import CharacterBasicInfo
+
+T = TypeVar("T")
+F = TypeVar("F", bound=Callable[..., Any])
+
+key_encoder = Encoder()
+
+# memoized results outside frozen mode
+memo_encoder = Encoder()
+
+
+def canonical_hash(basic: Struct) -> bytes:
+    """
+    Hash of basic info, equal for equal structs.
+    """
+    return hashlib.blake2b(key_encoder.encode(basic), digest_size=16).digest()
+
+
+class CacheStats(Struct):
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0  # approximate size of entries
+
+
+class InfoCache(Generic[T]):
+    """
+    Thread-safe LRU cache bounded by entry count and approximate bytes.
+    """
+
+    def __init__(
+        self, maxsize: Optional[int] = 1024, maxbytes: Optional[int] = None
+    ) -> None:
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.data: "OrderedDict[Hashable, Tuple[T, int]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def get(self, key: Hashable) -> Optional[T]:
+        with self.lock:
+            item = self.data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self.data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: Hashable, value: T, size: int = 0) -> None:
+        if self.maxbytes is not None and size > self.maxbytes:
+            return
+        with self.lock:
+            old = self.data.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self.data[key] = (value, size)
+            self.bytes += size
+            while (self.maxsize is not None and len(self.data) > self.maxsize) or (
+                self.maxbytes is not None and self.bytes > self.maxbytes
+            ):
+                _, (_, evicted_size) = self.data.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self.lock:
+            self.data.clear()
+            self.bytes = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            entries=len(self.data),
+            bytes=self.bytes,
+        )
+
+
+class FlightStats(Struct):
+    calls: int = 0
+    coalesced: int = 0  # calls which waited for another call
+    in_flight: int = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one computation, from
+    threads with `do` and from asyncio with `do_async`.
+
+    Callers waiting for a computation get its result or exception. Coalesced async
+    calls are shielded, cancelling one caller does not cancel the others.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.flights: Dict[Hashable, "Future[Any]"] = {}
+        self.async_flights: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self.lock:
+            self.calls += 1
+            future = self.flights.get(key)
+            leader = future is None
+            if leader:
+                future = self.flights[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                del self.flights[key]
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        # futures belong to one loop
+        key = (asyncio.get_running_loop(), key)
+        with self.lock:
+            self.calls += 1
+            future = self.async_flights.get(key)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                future = asyncio.ensure_future(fn())
+                self.async_flights[key] = future
+                future.add_done_callback(lambda _: self.async_flights.pop(key, None))
+        return await asyncio.shield(future)
+
+    @property
+    def stats(self) -> FlightStats:
+        with self.lock:
+            return FlightStats(
+                calls=self.calls,
+                coalesced=self.coalesced,
+                in_flight=len(self.flights) + len(self.async_flights),
+            )
+
+
+def sort_character_basic(
+    basic: CharacterBasicInfo, relic_order: Any
+) -> CharacterBasicInfo:
+    """
+    Get basic info with skill trees sorted by id and relics by `relic_order`.
+    """
+    return CharacterBasicInfo(
+        id=basic.id,
+        rank=basic.rank,
+        level=basic.level,
+        promotion=basic.promotion,
+        skill_tree_levels=sorted(basic.skill_tree_levels, key=lambda i: i.id),
+        light_cone=basic.light_cone,
+        relics=sorted(basic.relics, key=relic_order) if basic.relics else basic.relics,
+    )
+
+
+def memoized(key: Callable[..., Hashable]) -> Callable[[F], F]:
+    """
+    Memoize index method in its `memo` cache of the same name, if enabled.
+    `key` gets the positional arguments, calls with keyword arguments and None
+    results are not memoized. Results are shared in frozen mode, otherwise they
+    are kept encoded and each call gets its own copy.
+    """
+
+    def decorator(method: F) -> F:
+        name = method.__name__
+        decoder = Decoder(method.__annotations__["return"])
+
+        @wraps(method)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            memo = self.memo
+            if memo is None or kwargs:
+                return method(self, *args, **kwargs)
+            cache = memo[name]
+            k = key(*args)
+            value = cache.get(k)
+            if value is None:
+                value = method(self, *args)
+                if value is not None:
+                    cache.put(k, value if self.frozen else memo_encoder.encode(value))
+                return value
+            return value if self.frozen else decoder.decode(value)
+
+        return wrapper  # type: ignore
+
+    return decorator
@@ -0,0 +1,284 @@
+from typing import List, Union
+
+from msgspec import json, msgpack
+
+from .models.compact import (
+    CompactAttribute,
+    CompactCharacterInfo,
+    CompactDictionary,
+    CompactLightCone,
+    CompactProperty,
+    CompactRelic,
+    CompactRelicSet,
+    CompactSkill,
+    CompactSkillTree,
+    CompactSubAffix,
+)
+from .models.info import (
+    AttributeInfo,
+    CharacterInfo,
+    LightConeInfo,
+    PropertyInfo,
+    RelicInfo,
+    SkillInfo,
+    SkillTreeInfo,
+    SubAffixInfo,
+)
+from .utils import display_format
+
+
+def compact_character_info(
+    info: CharacterInfo, numeric_only: bool = False
+) -> CompactCharacterInfo:
+    """
+    Get compact character info, referencing static data of the index dictionary.
+    `numeric_only` should be the same as when the info was created.
+    """
+    light_cone = info.light_cone
+    return CompactCharacterInfo(
+        id=info.id,
+        rank=info.rank,
+        level=info.level,
+        promotion=info.promotion,
+        path=info.path.id if info.path else None,
+        element=info.element.id if info.element else None,
+        skills=[
+            CompactSkill(i.id, i.level, is_placeholder_skill(i)) for i in info.skills
+        ],
+        skill_trees=[
+            CompactSkillTree(i.id, i.level, i.max_level) for i in info.skill_trees
+        ],
+        light_cone=(
+            CompactLightCone(
+                light_cone.id,
+                light_cone.rank,
+                light_cone.level,
+                light_cone.promotion,
+                compact_attributes(light_cone.attributes),
+                compact_properties(light_cone.properties),
+            )
+            if light_cone
+            else None
+        ),
+        relics=[
+            CompactRelic(
+                i.id,
+                i.level,
+                (
+                    CompactProperty(i.main_affix.type, i.main_affix.value)
+                    if i.main_affix
+                    else None
+                ),
+                [
+                    CompactSubAffix(j.type, j.value, j.count, j.step)
+                    for j in i.sub_affix
+                ],
+            )
+            for i in info.relics
+        ],
+        relic_sets=[CompactRelicSet(i.id, i.num) for i in info.relic_sets],
+        attributes=compact_attributes(info.attributes),
+        additions=compact_attributes(info.additions),
+        properties=compact_properties(info.properties),
+        pos=info.pos,
+        rank_icons=bool(info.rank_icons),
+        numeric_only=numeric_only,
+    )
+
+
+def is_placeholder_skill(skill: SkillInfo) -> bool:
+    return skill.level == 0 and skill.name == skill.id and not skill.desc
+
+
+def compact_attributes(attributes: List[AttributeInfo]) -> List[CompactAttribute]:
+    return [CompactAttribute(i.field, i.value) for i in attributes]
+
+
+def compact_properties(properties: List[PropertyInfo]) -> List[CompactProperty]:
+    return [CompactProperty(i.type, i.value) for i in properties]
+
+
+class CompactDecoder:
+    """
+    Decoder of compact character infos to full character infos, with the
+    dictionary of the index version which encoded them.
+    """
+
+    def __init__(self, dictionary: CompactDictionary) -> None:
+        self.dictionary = dictionary
+        self.json_decoder = json.Decoder(CompactCharacterInfo)
+        self.msgpack_decoder = msgpack.Decoder(CompactCharacterInfo)
+
+    def decode_json(self, data: Union[bytes, str]) -> CharacterInfo:
+        return self.expand(self.json_decoder.decode(data))
+
+    def decode_msgpack(self, data: bytes) -> CharacterInfo:
+        return self.expand(self.msgpack_decoder.decode(data))
+
+    def expand(self, compact: CompactCharacterInfo) -> CharacterInfo:
+        """
+        Get full character info from compact character info.
+        """
+        d = self.dictionary
+        display = not compact.numeric_only
+        character = d.characters[compact.id]
+        return CharacterInfo(
+            id=compact.id,
+            name=character.name,
+            rarity=character.rarity,
+            rank=compact.rank,
+            level=compact.level,
+            promotion=compact.promotion,
+            icon=character.icon,
+            preview=character.preview,
+            portrait=character.portrait,
+            rank_icons=character.rank_icons if compact.rank_icons else [],
+            path=d.paths.get(compact.path) if compact.path else None,
+            element=d.elements.get(compact.element) if compact.element else None,
+            skills=[self.expand_skill(i, display) for i in compact.skills],
+            skill_trees=[self.expand_skill_tree(i) for i in compact.skill_trees],
+            light_cone=(
+                self.expand_light_cone(compact.light_cone, display)
+                if compact.light_cone
+                else None
+            ),
+            relics=[self.expand_relic(i, display) for i in compact.relics],
+            relic_sets=[
+                d.relic_sets[i.id][0 if i.num == 2 else 1] for i in compact.relic_sets
+            ],
+            attributes=self.expand_attributes(compact.attributes, display),
+            additions=self.expand_attributes(compact.additions, display),
+            properties=self.expand_properties(compact.properties, display),
+            pos=compact.pos,
+        )
+
+    def expand_skill(self, compact: CompactSkill, display: bool) -> SkillInfo:
+        skill = self.dictionary.skills[compact.id]
+        if compact.placeholder:
+            name, desc = compact.id, ""
+        else:
+            # level 0 renders with params of the last level, as in the index
+            name = skill.name
+            desc = (
+                skill.descs[(compact.level - 1) % len(skill.descs)] if display else ""
+            )
+        return SkillInfo(
+            id=compact.id,
+            name=name,
+            level=compact.level,
+            max_level=skill.max_level,
+            element=self.dictionary.elements.get(skill.element),
+            type=skill.type,
+            type_text=skill.type_text,
+            effect=skill.effect,
+            effect_text=skill.effect_text,
+            simple_desc=skill.simple_desc,
+            desc=desc,
+            icon=skill.icon,
+        )
+
+    def expand_skill_tree(self, compact: CompactSkillTree) -> SkillTreeInfo:
+        skill_tree = self.dictionary.skill_trees[compact.id]
+        return SkillTreeInfo(
+            id=compact.id,
+            level=compact.level,
+            anchor=skill_tree.anchor,
+            max_level=compact.max_level,
+            icon=skill_tree.icon,
+            parent=skill_tree.parent,
+        )
+
+    def expand_light_cone(
+        self, compact: CompactLightCone, display: bool
+    ) -> LightConeInfo:
+        light_cone = self.dictionary.light_cones[compact.id]
+        return LightConeInfo(
+            id=compact.id,
+            name=light_cone.name,
+            rarity=light_cone.rarity,
+            rank=compact.rank,
+            level=compact.level,
+            promotion=compact.promotion,
+            icon=light_cone.icon,
+            preview=light_cone.preview,
+            portrait=light_cone.portrait,
+            path=self.dictionary.paths.get(light_cone.path),
+            attributes=self.expand_attributes(compact.attributes, display),
+            properties=self.expand_properties(compact.properties, display),
+        )
+
+    def expand_relic(self, compact: CompactRelic, display: bool) -> RelicInfo:
+        relic = self.dictionary.relics[compact.id]
+        sub_affix = []
+        for i in compact.sub_affix:
+            property = self.dictionary.properties[i.type]
+            sub_affix.append(
+                SubAffixInfo(
+                    type=i.type,
+                    field=property.field,
+                    name=property.name,
+                    icon=property.icon,
+                    value=i.value,
+                    display=(
+                        display_format(i.value, property.percent) if display else ""
+                    ),
+                    percent=property.percent,
+                    count=i.count,
+                    step=i.step,
+                )
+            )
+        return RelicInfo(
+            id=compact.id,
+            name=relic.name,
+            type=relic.type,
+            set_id=relic.set_id,
+            set_name=relic.set_name,
+            rarity=relic.rarity,
+            level=compact.level,
+            icon=relic.icon,
+            main_affix=(
+                self.expand_properties([compact.main_affix], display)[0]
+                if compact.main_affix
+                else None
+            ),
+            sub_affix=sub_affix,
+        )
+
+    def expand_attributes(
+        self, attributes: List[CompactAttribute], display: bool
+    ) -> List[AttributeInfo]:
+        res = []
+        for i in attributes:
+            field = self.dictionary.fields[i.field]
+            res.append(
+                AttributeInfo(
+                    field=i.field,
+                    name=field.name,
+                    icon=field.icon,
+                    value=i.value,
+                    display=display_format(i.value, field.percent) if display else "",
+                    percent=field.percent,
+                )
+            )
+        return res
+
+    def expand_properties(
+        self, properties: List[CompactProperty], display: bool
+    ) -> List[PropertyInfo]:
+        res = []
+        for i in properties:
+            property = self.dictionary.properties[i.type]
+            res.append(
+                PropertyInfo(
+                    type=i.type,
+                    field=property.field,
+                    name=property.name,
+                    icon=property.icon,
+                    value=i.value,
+                    display=(
+                        display_format(i.value, property.percent) if display else ""
+                    ),
+                    percent=property.percent,
+                )
+            )
+        return res
@@ -0,0 +1,95 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from msgspec import DecodeError, Struct
+from msgspec.msgpack import Decoder, encode
+
+from .models.avatars import AvatarIndex
+from .models.characters import (
+    CharacterIndex,
+    CharacterPromotionIndex,
+    CharacterRankIndex,
+    CharacterSkillIndex,
+    CharacterSkillTreeIndex,
+)
+from .models.elements import ElementIndex
+from .models.light_cones import (
+    LightConeIndex,
+    LightConePromotionIndex,
+    LightConeRankIndex,
+)
+from .models.paths import PathIndex
+from .models.properties import PropertyIndex
+from .models.relics import (
+    RelicIndex,
+    RelicMainAffixIndex,
+    RelicSetIndex,
+    RelicSubAffixIndex,
+)
+from .packing import encode_hook
+from .utils import ArchivePath
+
+COMPILED_VERSION = 1
+
+
+class CompiledIndex(Struct):
+    version: int  # compiled format version
+    hash: str  # content hash of source json files
+    characters: CharacterIndex
+    character_ranks: CharacterRankIndex
+    character_skills: CharacterSkillIndex
+    character_skill_trees: CharacterSkillTreeIndex
+    character_promotions: CharacterPromotionIndex
+    light_cones: LightConeIndex
+    light_cone_ranks: LightConeRankIndex
+    light_cone_promotions: LightConePromotionIndex
+    relics: RelicIndex
+    relic_sets: RelicSetIndex
+    relic_main_affixes: RelicMainAffixIndex
+    relic_sub_affixes: RelicSubAffixIndex
+    paths: PathIndex
+    elements: ElementIndex
+    properties: PropertyIndex
+    avatars: AvatarIndex
+    # derived tables
+    property_fields: Dict[str, str]  # field -> property type
+    skill_descs: Dict[str, List[str]]  # skill id -> rendered desc per level
+
+
+def index_hash(folder: Union[Path, ArchivePath], files: List[str]) -> str:
+    """
+    Content hash of index json files.
+    """
+    h = hashlib.sha256()
+    for file in files:
+        h.update(file.encode())
+        h.update((folder / file).read_bytes())
+    return h.hexdigest()
+
+
+def read_compiled(path: Path, hash: Optional[str] = None) -> Optional[CompiledIndex]:
+    """
+    Read compiled index, return None if it is missing, broken or stale.
+    """
+    if not path.exists():
+        return None
+    try:
+        compiled = Decoder(CompiledIndex).decode(path.read_bytes())
+    except DecodeError:
+        return None
+    if compiled.version != COMPILED_VERSION:
+        return None
+    if hash is not None and compiled.hash != hash:
+        return None
+    return compiled
+
+
+def write_compiled(path: Path, compiled: CompiledIndex) -> None:
+    """
+    Write compiled index atomically.
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(encode(compiled, enc_hook=encode_hook))
+    os.replace(tmp, path)
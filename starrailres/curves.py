@@ -0,0 +1,91 @@
+import math
+from array import array
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+PROMOTIONS = 7  # 0-6
+LEVELS = 80  # 1-80
+
+
+class PromotionCurves:
+    """
+    Promotion stat table of shape (entity, promotion, level, field).
+
+    Stats at one level are computed from the promotion structs, dense rows of an
+    entity are only allocated by `get_curve` or `fill`, so the table costs no
+    memory on the info path. `values` is the whole table as one flat `array("d")`,
+    fields without value are NaN, e.g. for
+    `numpy.frombuffer(curves.values).reshape(curves.shape)`.
+    """
+
+    def __init__(self, promotions: Mapping[str, Any]) -> None:
+        self.promotions = promotions
+        self.ids: List[str] = list(promotions)
+        self.id_index: Dict[str, int] = {id: i for i, id in enumerate(self.ids)}
+        self.fields: List[str] = []
+        self.field_index: Dict[str, int] = {}
+        for promotion in promotions.values():
+            for values in promotion.values:
+                for field in values:
+                    if field not in self.field_index:
+                        self.field_index[field] = len(self.fields)
+                        self.fields.append(field)
+        self.shape = (len(self.ids), PROMOTIONS, LEVELS, len(self.fields))
+        # dense rows of entities, by entity position
+        self.blocks: Dict[int, array] = {}
+
+    @property
+    def values(self) -> array:
+        """
+        Whole table, built on each access without keeping unfilled entities.
+        """
+        values = array("d")
+        for i in range(len(self.ids)):
+            block = self.blocks.get(i)
+            values += block if block is not None else self.build_block(i)
+        return values
+
+    def fill(self, id: Optional[str] = None) -> None:
+        """
+        Keep dense rows of entity, or of all entities.
+        """
+        for i in [self.id_index[id]] if id is not None else range(len(self.ids)):
+            if i not in self.blocks:
+                self.blocks[i] = self.build_block(i)
+
+    def build_block(self, i: int) -> array:
+        width = len(self.fields)
+        block = array("d", [math.nan]) * (PROMOTIONS * LEVELS * width)
+        levels = range(LEVELS)
+        for p, values in enumerate(self.promotions[self.ids[i]].values[:PROMOTIONS]):
+            for field, v in values.items():
+                start = p * LEVELS * width + self.field_index[field]
+                stop = start + LEVELS * width
+                block[start:stop:width] = array(
+                    "d", [v.base + v.step * level for level in levels]
+                )
+        return block
+
+    def get_values(
+        self, id: str, promotion: int, level: int
+    ) -> List[Tuple[str, float]]:
+        """
+        Get (field, value) pairs of entity at promotion and level.
+        """
+        entity = self.promotions.get(id)
+        if entity is None or promotion >= min(len(entity.values), PROMOTIONS):
+            return []
+        level -= 1
+        return [
+            (field, v.base + v.step * level)
+            for field, v in entity.values[promotion].items()
+        ]
+
+    def get_curve(self, id: str, field: str, promotion: int) -> array:
+        """
+        Get values of field at levels 1-80 for entity and promotion.
+        """
+        self.fill(id)
+        width = len(self.fields)
+        start = promotion * LEVELS * width + self.field_index[field]
+        block = self.blocks[self.id_index[id]]
+        return block[start : start + LEVELS * width : width]
@@ -0,0 +1,159 @@
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping, Set, Union
+
+from msgspec import Struct
+
+from .index import Index, index_tables
+
+
+class IndexDiff(Struct):
+    tables: Dict[str, Set[str]]  # table -> added, removed or modified ids
+    characters: Set[str]  # character ids whose info may change
+    light_cones: Set[str]  # light cone ids whose info may change
+    relics: Set[str]  # relic ids whose info may change
+
+    def __bool__(self) -> bool:
+        return any(self.tables.values())
+
+
+def diff_table(old: Mapping[str, Any], new: Mapping[str, Any]) -> Set[str]:
+    """
+    Get ids added, removed or modified between two tables.
+    """
+    changed = set(old.keys() ^ new.keys())
+    for id in old.keys() & new.keys():
+        if old[id] != new[id]:
+            changed.add(id)
+    return changed
+
+
+def diff_index(old: Union[Index, Path], new: Union[Index, Path]) -> IndexDiff:
+    """
+    Compare two indexes or index folders table by table.
+
+    Besides changed ids per table, the ids of characters, light cones and relics
+    whose info may change are resolved through the tables they reference. Cached
+    character info is stale if its character, light cone or any relic is listed.
+    """
+    old = old if isinstance(old, Index) else Index(old, lazy=True)
+    new = new if isinstance(new, Index) else Index(new, lazy=True)
+    tables = {
+        name: diff_table(getattr(old, name), getattr(new, name))
+        for name in index_tables
+    }
+    properties = tables["properties"]
+    fields = {
+        index.properties[type].field
+        for index in (old, new)
+        for type in properties
+        if type in index.properties
+    }
+    characters: Set[str] = set()
+    light_cones: Set[str] = set()
+    relics: Set[str] = set()
+    for index in (old, new):
+        characters.update(
+            id
+            for id in index.characters
+            if character_changed(index, id, tables, fields)
+        )
+        light_cones.update(
+            id
+            for id in index.light_cones
+            if light_cone_changed(index, id, tables, fields)
+        )
+        relics.update(id for id in index.relics if relic_changed(index, id, tables))
+    return IndexDiff(
+        tables={name: ids for name, ids in tables.items() if ids},
+        characters=characters,
+        light_cones=light_cones,
+        relics=relics,
+    )
+
+
+def intersects(ids: Iterable[str], changed: Set[str]) -> bool:
+    return any(id in changed for id in ids)
+
+
+def character_changed(
+    index: Index, id: str, tables: Dict[str, Set[str]], fields: Set[str]
+) -> bool:
+    character = index.characters[id]
+    if (
+        id in tables["characters"]
+        or id in tables["character_promotions"]
+        or character.path in tables["paths"]
+        or character.element in tables["elements"]
+        or intersects(character.ranks, tables["character_ranks"])
+        or intersects(character.skills, tables["character_skills"])
+        or intersects(character.skill_trees, tables["character_skill_trees"])
+    ):
+        return True
+    for skill_id in character.skills:
+        skill = index.character_skills.get(skill_id)
+        if skill and skill.element in tables["elements"]:
+            return True
+    for skill_tree_id in character.skill_trees:
+        skill_tree = index.character_skill_trees.get(skill_tree_id)
+        if skill_tree and any(
+            property.type in tables["properties"]
+            for level in skill_tree.levels
+            for property in level.properties
+        ):
+            return True
+    promotion = index.character_promotions.get(id)
+    return bool(promotion) and any(
+        intersects(values, fields) for values in promotion.values
+    )
+
+
+def light_cone_changed(
+    index: Index, id: str, tables: Dict[str, Set[str]], fields: Set[str]
+) -> bool:
+    if (
+        id in tables["light_cones"]
+        or id in tables["light_cone_ranks"]
+        or id in tables["light_cone_promotions"]
+        or index.light_cones[id].path in tables["paths"]
+    ):
+        return True
+    rank = index.light_cone_ranks.get(id)
+    if rank and any(
+        property.type in tables["properties"]
+        for properties in rank.properties
+        for property in properties
+    ):
+        return True
+    promotion = index.light_cone_promotions.get(id)
+    return bool(promotion) and any(
+        intersects(values, fields) for values in promotion.values
+    )
+
+
+def relic_changed(index: Index, id: str, tables: Dict[str, Set[str]]) -> bool:
+    relic = index.relics[id]
+    if (
+        id in tables["relics"]
+        or relic.set_id in tables["relic_sets"]
+        or relic.main_affix_id in tables["relic_main_affixes"]
+        or relic.sub_affix_id in tables["relic_sub_affixes"]
+    ):
+        return True
+    if not tables["properties"]:
+        return False
+    relic_set = index.relic_sets.get(relic.set_id)
+    if relic_set and any(
+        property.type in tables["properties"]
+        for properties in relic_set.properties
+        for property in properties
+    ):
+        return True
+    return any(
+        affix.property in tables["properties"]
+        for group in (
+            index.relic_main_affixes.get(relic.main_affix_id),
+            index.relic_sub_affixes.get(relic.sub_affix_id),
+        )
+        if group
+        for affix in group.affixes.values()
+    )
@@ -1,8 +1,34 @@
-import math
-from copy import deepcopy
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Optional
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from msgspec import convert, json
+from msgspec.msgpack import Decoder, Encoder
+from msgspec.structs import replace
 
+from .batch import (
+    encode_chunk_infos,
+    get_chunk_infos,
+    get_chunks,
+    init_worker,
+    map_chunks,
+)
+from .curves import PromotionCurves
 from .models.avatars import AvatarIndex
 from .models.characters import (
     CharacterIndex,
@@ -12,6 +38,7 @@ from .models.characters import (
     CharacterSkillTreeIndex,
 )
 from .models.elements import ElementIndex
+from .models.frozen import derive_type, frozen_info_types
 from .models.info import (
     AttributeInfo,
     AvatarInfo,
@@ -31,20 +58,127 @@ from .models.info import (
     SubAffixInfo,
     SubAffixBasicInfo,
 )
+from .models.compact import (
+    CharacterEntry,
+    CompactCharacterInfo,
+    CompactDictionary,
+    FieldEntry,
+    LightConeEntry,
+    PropertyEntry,
+    RelicEntry,
+    SkillEntry,
+    SkillTreeEntry,
+)
+from .models.links import CharacterLink, CharacterLinkIndex, RelicLink, RelicLinkIndex
 from .models.light_cones import (
     LightConeIndex,
     LightConePromotionIndex,
     LightConeRankIndex,
 )
 from .models.paths import PathIndex
-from .models.properties import PropertyIndex
+from .models.properties import PropertyIndex, PropertyType
 from .models.relics import (
     RelicIndex,
     RelicMainAffixIndex,
     RelicSetIndex,
     RelicSubAffixIndex,
 )
-from .utils import decode_json
+from .cache import (
+    InfoCache,
+    SingleFlight,
+    canonical_hash,
+    key_encoder,
+    memoized,
+    sort_character_basic,
+)
+from .compact import compact_character_info
+from .compiled import (
+    COMPILED_VERSION,
+    CompiledIndex,
+    index_hash,
+    read_compiled,
+    write_compiled,
+)
+from .packing import TablePacker
+from .persistent import DiskCache
+from .template import get_template
+from .utils import ArchivePath, decode_json, display_format
+
+T = TypeVar("T")
+
+index_tables: Dict[str, Tuple[str, Any]] = {
+    "characters": ("characters.json", CharacterIndex),
+    "character_ranks": ("character_ranks.json", CharacterRankIndex),
+    "character_skills": ("character_skills.json", CharacterSkillIndex),
+    "character_skill_trees": ("character_skill_trees.json", CharacterSkillTreeIndex),
+    "character_promotions": ("character_promotions.json", CharacterPromotionIndex),
+    "light_cones": ("light_cones.json", LightConeIndex),
+    "light_cone_ranks": ("light_cone_ranks.json", LightConeRankIndex),
+    "light_cone_promotions": ("light_cone_promotions.json", LightConePromotionIndex),
+    "relics": ("relics.json", RelicIndex),
+    "relic_sets": ("relic_sets.json", RelicSetIndex),
+    "relic_main_affixes": ("relic_main_affixes.json", RelicMainAffixIndex),
+    "relic_sub_affixes": ("relic_sub_affixes.json", RelicSubAffixIndex),
+    "paths": ("paths.json", PathIndex),
+    "elements": ("elements.json", ElementIndex),
+    "properties": ("properties.json", PropertyIndex),
+    "avatars": ("avatars.json", AvatarIndex),
+}
+
+
+# derived table -> builder method
+derived_tables: Dict[str, str] = {
+    "content_hash": "build_content_hash",
+    "field_properties": "build_field_properties",
+    "character_links": "build_dict",
+    "relic_links": "build_dict",
+    "desc_cache": "build_dict",
+    "property_slots": "build_property_slots",
+    "field_slots": "build_field_slots",
+    "character_curves": "build_character_curves",
+    "light_cone_curves": "build_light_cone_curves",
+    "avatar_infos": "build_avatar_infos",
+    "path_infos": "build_path_infos",
+    "element_infos": "build_element_infos",
+    "relic_set_infos": "build_relic_set_infos",
+    "info_decoder": "build_info_decoder",
+    "compact_dictionary": "build_compact_dictionary",
+}
+
+
+# optional sections of character info
+character_sections: FrozenSet[str] = frozenset(
+    [
+        "rank_icons",
+        "path",
+        "element",
+        "skills",
+        "skill_trees",
+        "light_cone",
+        "relics",
+        "relic_sets",
+        "attributes",
+        "additions",
+        "properties",
+    ]
+)
+
+# methods memoized in memo mode
+memoized_methods: List[str] = [
+    "get_light_cone_info",
+    "get_relic_info",
+    "get_relic_main_affix",
+    "get_character_skill_upgrade_from_rank",
+    "get_character_skill_info",
+]
+
+# shared info encoders, msgpack one also for approximate info sizes
+info_encoder = Encoder()
+json_encoder = json.Encoder()
+
+
+# guards slots assigned to keys unknown to the index
+slot_lock = threading.Lock()
 
 
 relic_type_map: Dict[str, int] = {
@@ -57,6 +191,15 @@ relic_type_map: Dict[str, int] = {
 }
 
 
+def encode_info(
+    encoder: Any, info: Any, buffer: Optional[bytearray], offset: int
+) -> Union[bytes, bytearray]:
+    if buffer is None:
+        return encoder.encode(info)
+    encoder.encode_into(info, buffer, offset)
+    return buffer
+
+
 class Index:
     characters: CharacterIndex
     character_ranks: CharacterRankIndex
@@ -74,194 +217,964 @@ class Index:
     elements: ElementIndex
     properties: PropertyIndex
     avatars: AvatarIndex
+    # info types, frozen variants in frozen mode
+    AttributeInfo = AttributeInfo
+    AvatarInfo = AvatarInfo
+    CharacterInfo = CharacterInfo
+    ElementInfo = ElementInfo
+    LevelInfo = LevelInfo
+    LightConeInfo = LightConeInfo
+    PathInfo = PathInfo
+    PropertyInfo = PropertyInfo
+    RelicInfo = RelicInfo
+    RelicSetInfo = RelicSetInfo
+    SkillInfo = SkillInfo
+    SkillTreeInfo = SkillTreeInfo
+    SubAffixInfo = SubAffixInfo
+    info_cache: Optional[InfoCache] = None
+    memo: Optional[Dict[str, InfoCache]] = None
+    disk_cache: Optional[DiskCache] = None
+    single_flight: Optional[SingleFlight] = None
+    # derived tables
+    content_hash: str
+    field_properties: Dict[str, PropertyType]
+    skill_descs: Dict[str, List[str]]
+    character_links: CharacterLinkIndex
+    relic_links: RelicLinkIndex
+    desc_cache: Dict[Tuple[str, str, int], str]
+    property_slots: Dict[str, int]
+    field_slots: Dict[str, int]
+    character_curves: PromotionCurves
+    light_cone_curves: PromotionCurves
+    avatar_infos: Dict[str, AvatarInfo]
+    path_infos: Dict[str, PathInfo]
+    element_infos: Dict[str, ElementInfo]
+    relic_set_infos: Dict[str, Tuple[RelicSetInfo, RelicSetInfo]]
+    info_decoder: Decoder
+    compact_dictionary: CompactDictionary
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> "Index":
+        self = super().__new__(cls)
+        # constructor arguments, to load the same index in worker processes
+        self.init_args = (args, kwargs)
+        return self
 
-    def __init__(self, folder: Path) -> None:
+    def __init__(
+        self,
+        folder: Union[Path, ArchivePath],
+        lazy: bool = False,
+        preload: Optional[Iterable[str]] = None,
+        workers: Optional[int] = None,
+        use_mmap: bool = False,
+        compiled: Optional[Path] = None,
+        linked: bool = False,
+        frozen: bool = False,
+        cache_size: Optional[int] = None,
+        cache_bytes: Optional[int] = None,
+        memoize: Optional[int] = None,
+        disk_cache: Union[Path, DiskCache, None] = None,
+        disk_cache_bytes: Optional[int] = None,
+        coalesce: bool = False,
+        compact_tables: bool = False,
+        canonical: bool = False,
+    ) -> None:
+        """
+        Load index from folder, or from a folder inside an archive with `ArchivePath`.
+
+        In lazy mode only tables in `preload` are decoded here, the others are
+        decoded on first attribute access. With `workers` the tables are decoded
+        concurrently on a thread pool, `use_mmap` maps the files instead of reading.
+        With `compiled` all tables are loaded from the compiled index file, which is
+        rebuilt from the json files when missing or stale. With `linked` references
+        are validated and resolved for all characters and relics here, instead of on
+        first use of each. With `frozen` tables are read-only mappings of frozen
+        structs and all returned info structs are frozen, with tuples in place of
+        lists and read-only mappings in place of dicts. With `cache_size` or
+        `cache_bytes` character infos are kept in a LRU cache of that many entries or
+        approximate bytes. With `memoize` light cone, relic, skill and rank upgrade
+        results are kept too, up to that many entries per method. Cached results are
+        shared in frozen mode, otherwise they are kept encoded and every call gets
+        its own copy. With `disk_cache` encoded character infos are also kept in that
+        SQLite file, shared across processes and restarts and bounded by
+        `disk_cache_bytes`. With `coalesce` concurrent calls for the same character
+        build wait for one computation and share its info. With `compact_tables`
+        tables take less memory: their structs are not tracked by the garbage
+        collector, ids and property types are interned and skill and light cone
+        params are float arrays. With `canonical` skill trees and relics of basic
+        infos are sorted first, so the same build in any order shares cache entries,
+        this changes the order of properties and additions and may change the last
+        bits of additions compared to the given order.
+        """
         if not folder.exists():
             raise Exception("Please select an existing index folder!")
-        self.characters = decode_json(folder / "characters.json", CharacterIndex)
-        self.character_ranks = decode_json(
-            folder / "character_ranks.json", CharacterRankIndex
+        self.setup(
+            folder,
+            lazy=lazy,
+            use_mmap=use_mmap,
+            frozen=frozen,
+            cache_size=cache_size,
+            cache_bytes=cache_bytes,
+            memoize=memoize,
+            disk_cache=disk_cache,
+            disk_cache_bytes=disk_cache_bytes,
+            coalesce=coalesce,
+            compact_tables=compact_tables,
+            canonical=canonical,
         )
-        self.character_skills = decode_json(
-            folder / "character_skills.json", CharacterSkillIndex
-        )
-        self.character_skill_trees = decode_json(
-            folder / "character_skill_trees.json", CharacterSkillTreeIndex
-        )
-        self.character_promotions = decode_json(
-            folder / "character_promotions.json", CharacterPromotionIndex
+        if compiled is not None:
+            self.load_compiled(compiled, workers)
+        else:
+            self.load_tables(index_tables if not lazy else preload or [], workers)
+        if linked:
+            self.link()
+
+    def setup(
+        self,
+        folder: Union[Path, ArchivePath],
+        lazy: bool = False,
+        use_mmap: bool = False,
+        frozen: bool = False,
+        cache_size: Optional[int] = None,
+        cache_bytes: Optional[int] = None,
+        memoize: Optional[int] = None,
+        disk_cache: Union[Path, DiskCache, None] = None,
+        disk_cache_bytes: Optional[int] = None,
+        coalesce: bool = False,
+        compact_tables: bool = False,
+        canonical: bool = False,
+    ) -> None:
+        """
+        Set options and caches of the index, before any table is loaded.
+        """
+        self.folder = folder
+        self.lazy = lazy
+        self.use_mmap = use_mmap
+        self.frozen = frozen
+        self.compact_tables = compact_tables
+        self.canonical = canonical
+        if compact_tables:
+            self.table_packer = TablePacker()
+        if cache_size is not None or cache_bytes is not None:
+            self.info_cache = InfoCache(cache_size, cache_bytes)
+        if memoize is not None:
+            self.memo = {name: InfoCache(memoize) for name in memoized_methods}
+        if disk_cache is not None:
+            if not isinstance(disk_cache, DiskCache):
+                disk_cache = DiskCache(disk_cache, disk_cache_bytes)
+            self.disk_cache = disk_cache
+        if coalesce:
+            self.single_flight = SingleFlight()
+        if frozen:
+            for name, t in frozen_info_types.items():
+                setattr(self, name, t)
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for missing attributes, i.e. tables not loaded yet
+        if "folder" in self.__dict__:
+            if name in index_tables:
+                return self.load_table(name)
+            if name in derived_tables:
+                value = getattr(self, derived_tables[name])()
+                setattr(self, name, value)
+                return value
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
         )
-        self.light_cones = decode_json(folder / "light_cones.json", LightConeIndex)
-        self.light_cone_ranks = decode_json(
-            folder / "light_cone_ranks.json", LightConeRankIndex
+
+    @property
+    def loaded_tables(self) -> List[str]:
+        """
+        Names of tables currently loaded.
+        """
+        return [name for name in index_tables if name in self.__dict__]
+
+    def load_table(self, name: str) -> Any:
+        """
+        Decode table by name and keep it on the index.
+        """
+        if name not in index_tables:
+            raise ValueError(f"Unknown index table: {name}")
+        file, t = index_tables[name]
+        table = decode_json(self.folder / file, self.table_type(t), self.use_mmap)
+        if self.compact_tables:
+            table = self.table_packer.pack(table)
+        if self.frozen:
+            table = MappingProxyType(table)
+        setattr(self, name, table)
+        return table
+
+    def table_type(self, t: Any) -> Any:
+        """
+        Table type with struct options of the load mode.
+        """
+        return derive_type(t, frozen=self.frozen, gc=not self.compact_tables)
+
+    def load_tables(self, names: Iterable[str], workers: Optional[int] = None) -> None:
+        """
+        Decode tables by names, concurrently if `workers` is given.
+        """
+        names = list(names)
+        if not workers or len(names) < 2:
+            for name in names:
+                self.load_table(name)
+            return
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # consume results to re-raise decode errors
+            list(executor.map(self.load_table, names))
+
+    def load_compiled(self, path: Path, workers: Optional[int] = None) -> None:
+        """
+        Load tables from compiled index, rebuild it if missing or stale.
+        """
+        compiled = read_compiled(path, self.content_hash)
+        if compiled is None:
+            self.load_tables(index_tables, workers)
+            try:
+                self.compile(path)
+            except OSError:
+                pass  # read-only location, keep using json tables
+            return
+        for name, (_, t) in index_tables.items():
+            table = getattr(compiled, name)
+            if self.frozen or self.compact_tables:
+                table = convert(table, self.table_type(t), from_attributes=True)
+            if self.compact_tables:
+                table = self.table_packer.pack(table)
+            if self.frozen:
+                table = MappingProxyType(table)
+            setattr(self, name, table)
+        self.field_properties = {
+            k: self.properties[v] for k, v in compiled.property_fields.items()
+        }
+        self.skill_descs = compiled.skill_descs
+
+    def compile(self, path: Path) -> CompiledIndex:
+        """
+        Write compiled index with decoded and derived tables to path.
+        """
+        compiled = CompiledIndex(
+            version=COMPILED_VERSION,
+            hash=self.content_hash,
+            property_fields={k: v.type for k, v in self.field_properties.items()},
+            skill_descs=self.build_skill_descs(),
+            **{name: getattr(self, name) for name in index_tables},
         )
-        self.light_cone_promotions = decode_json(
-            folder / "light_cone_promotions.json", LightConePromotionIndex
+        write_compiled(path, compiled)
+        return compiled
+
+    def build_content_hash(self) -> str:
+        return index_hash(self.folder, [file for file, _ in index_tables.values()])
+
+    def build_field_properties(self) -> Dict[str, PropertyType]:
+        field_properties: Dict[str, PropertyType] = {}
+        for property in self.properties.values():
+            field_properties.setdefault(property.field, property)
+        return field_properties
+
+    def build_dict(self) -> Dict[Any, Any]:
+        # filled on first use of each entry
+        return {}
+
+    def build_property_slots(self) -> Dict[str, int]:
+        return {type: slot for slot, type in enumerate(self.properties)}
+
+    def build_field_slots(self) -> Dict[str, int]:
+        return {field: slot for slot, field in enumerate(self.field_properties)}
+
+    def build_avatar_infos(self) -> Dict[str, AvatarInfo]:
+        return {
+            id: self.AvatarInfo(id=id, name=avatar.name, icon=avatar.icon)
+            for id, avatar in self.avatars.items()
+        }
+
+    def build_path_infos(self) -> Dict[str, PathInfo]:
+        return {
+            id: self.PathInfo(id, path.name, path.icon)
+            for id, path in self.paths.items()
+        }
+
+    def build_element_infos(self) -> Dict[str, ElementInfo]:
+        return {
+            id: self.ElementInfo(id, element.name, element.color, element.icon)
+            for id, element in self.elements.items()
+        }
+
+    def build_relic_set_infos(self) -> Dict[str, Tuple[RelicSetInfo, RelicSetInfo]]:
+        # 2 and 4 piece bonus of each relic set
+        relic_set_infos = {}
+        for id, relic_set in self.relic_sets.items():
+            infos = []
+            for num, i in ((2, 0), (4, 1)):
+                infos.append(
+                    self.RelicSetInfo(
+                        id=id,
+                        name=relic_set.name,
+                        icon=relic_set.icon,
+                        num=num,
+                        desc=relic_set.desc[i] if len(relic_set.desc) > i else "",
+                        properties=[
+                            self.PropertyInfo(
+                                type=p.type,
+                                field=self.properties[p.type].field,
+                                name=self.properties[p.type].name,
+                                icon=self.properties[p.type].icon,
+                                value=p.value,
+                                display=self.value_display_format(
+                                    p.value,
+                                    self.properties[p.type].percent,
+                                ),
+                                percent=self.properties[p.type].percent,
+                            )
+                            for p in (
+                                relic_set.properties[i]
+                                if len(relic_set.properties) > i
+                                else []
+                            )
+                        ],
+                    )
+                )
+            relic_set_infos[id] = (infos[0], infos[1])
+        return relic_set_infos
+
+    def build_info_decoder(self) -> Decoder:
+        return Decoder(self.CharacterInfo)
+
+    def build_compact_dictionary(self) -> CompactDictionary:
+        characters = {}
+        for id in self.characters:
+            link = self.get_character_link(id)
+            if link is None:
+                continue
+            character = link.character
+            characters[id] = CharacterEntry(
+                name=character.name,
+                rarity=character.rarity,
+                icon=character.icon,
+                preview=character.preview,
+                portrait=character.portrait,
+                rank_icons=[rank.icon for rank in link.ranks if rank is not None],
+            )
+        relics = {}
+        for id in self.relics:
+            relic_link = self.get_relic_link(id)
+            if relic_link is None:
+                continue
+            relics[id] = RelicEntry(
+                name=relic_link.relic.name,
+                type=relic_link.type,
+                set_id=relic_link.relic.set_id,
+                set_name=relic_link.set.name,
+                rarity=relic_link.relic.rarity,
+                icon=relic_link.relic.icon,
+            )
+        return CompactDictionary(
+            hash=self.content_hash,
+            paths=dict(self.path_infos),
+            elements=dict(self.element_infos),
+            properties={
+                type: PropertyEntry(
+                    property.field, property.name, property.icon, property.percent
+                )
+                for type, property in self.properties.items()
+            },
+            fields={
+                field: FieldEntry(property.name, property.icon, property.percent)
+                for field, property in self.field_properties.items()
+            },
+            characters=characters,
+            skills={
+                id: SkillEntry(
+                    name=skill.name,
+                    max_level=skill.max_level,
+                    element=skill.element,
+                    type=skill.type,
+                    type_text=skill.type_text,
+                    effect=skill.effect,
+                    effect_text=skill.effect_text,
+                    simple_desc=skill.simple_desc,
+                    icon=skill.icon,
+                    descs=[
+                        self.get_skill_desc(id, level)
+                        for level in range(1, max(len(skill.params), 1) + 1)
+                    ],
+                )
+                for id, skill in self.character_skills.items()
+            },
+            skill_trees={
+                id: SkillTreeEntry(
+                    anchor=skill_tree.anchor,
+                    max_level=skill_tree.max_level,
+                    icon=skill_tree.icon,
+                    parent=skill_tree.pre_points[0] if skill_tree.pre_points else None,
+                )
+                for id, skill_tree in self.character_skill_trees.items()
+            },
+            light_cones={
+                id: LightConeEntry(
+                    name=light_cone.name,
+                    rarity=light_cone.rarity,
+                    icon=light_cone.icon,
+                    preview=light_cone.preview,
+                    portrait=light_cone.portrait,
+                    path=light_cone.path,
+                )
+                for id, light_cone in self.light_cones.items()
+            },
+            relics=relics,
+            relic_sets={id: list(infos) for id, infos in self.relic_set_infos.items()},
         )
-        self.relics = decode_json(folder / "relics.json", RelicIndex)
-        self.relic_sets = decode_json(folder / "relic_sets.json", RelicSetIndex)
-        self.relic_main_affixes = decode_json(
-            folder / "relic_main_affixes.json", RelicMainAffixIndex
+
+    def build_character_curves(self) -> PromotionCurves:
+        return PromotionCurves(self.character_promotions)
+
+    def build_light_cone_curves(self) -> PromotionCurves:
+        return PromotionCurves(self.light_cone_promotions)
+
+    def build_character_link(self, id: str) -> CharacterLink:
+        character = self.characters[id]
+        return CharacterLink(
+            character=character,
+            ranks=[self.character_ranks.get(i) for i in character.ranks],
+            skills={
+                i: self.character_skills[i]
+                for i in character.skills
+                if i in self.character_skills
+            },
+            skill_trees={
+                i: self.character_skill_trees[i]
+                for i in character.skill_trees
+                if i in self.character_skill_trees
+            },
+            complete_skill_trees=all(
+                i in self.character_skill_trees for i in character.skill_trees
+            ),
         )
-        self.relic_sub_affixes = decode_json(
-            folder / "relic_sub_affixes.json", RelicSubAffixIndex
+
+    def build_relic_link(self, id: str) -> RelicLink:
+        relic = self.relics[id]
+        return RelicLink(
+            relic=relic,
+            type=relic_type_map.get(relic.type, 0),
+            set=self.relic_sets.get(relic.set_id),
+            main_affixes=self.relic_main_affixes.get(relic.main_affix_id),
+            sub_affixes=self.relic_sub_affixes.get(relic.sub_affix_id),
         )
-        self.paths = decode_json(folder / "paths.json", PathIndex)
-        self.elements = decode_json(folder / "elements.json", ElementIndex)
-        self.properties = decode_json(folder / "properties.json", PropertyIndex)
-        self.avatars = decode_json(folder / "avatars.json", AvatarIndex)
+
+    def link(self) -> None:
+        """
+        Validate references and resolve them for all characters and relics.
+        """
+        errors = self.validate_references()
+        if errors:
+            raise Exception(f"Broken index references: {'; '.join(errors[:10])}")
+        self.character_links = {
+            id: self.build_character_link(id) for id in self.characters
+        }
+        self.relic_links = {id: self.build_relic_link(id) for id in self.relics}
+
+    def validate_references(self) -> List[str]:
+        """
+        Find references which are required by info methods but missing.
+        """
+        errors = []
+        for id, character in self.characters.items():
+            for rank in character.ranks:
+                if rank not in self.character_ranks:
+                    errors.append(f"character {id}: missing rank {rank}")
+            for skill in character.skills:
+                if skill not in self.character_skills:
+                    errors.append(f"character {id}: missing skill {skill}")
+        for id, relic in self.relics.items():
+            if relic.set_id not in self.relic_sets:
+                errors.append(f"relic {id}: missing set {relic.set_id}")
+        for id, relic_set in self.relic_sets.items():
+            for properties in relic_set.properties:
+                for property in properties:
+                    if property.type not in self.properties:
+                        errors.append(f"relic set {id}: missing {property.type}")
+        for affixes in (self.relic_main_affixes, self.relic_sub_affixes):
+            for id, group in affixes.items():
+                for affix in group.affixes.values():
+                    if affix.property not in self.properties:
+                        errors.append(f"affix group {id}: missing {affix.property}")
+        return errors
+
+    def get_character_link(self, id: str) -> Optional[CharacterLink]:
+        """
+        Get resolved references of character.
+        """
+        link = self.character_links.get(id)
+        if link is None and id in self.characters:
+            link = self.character_links[id] = self.build_character_link(id)
+        return link
+
+    def get_relic_link(self, id: str) -> Optional[RelicLink]:
+        """
+        Get resolved references of relic.
+        """
+        link = self.relic_links.get(id)
+        if link is None and id in self.relics:
+            link = self.relic_links[id] = self.build_relic_link(id)
+        return link
+
+    def build_skill_descs(self) -> Dict[str, List[str]]:
+        return {
+            id: [self.format_template(skill.desc, params) for params in skill.params]
+            for id, skill in self.character_skills.items()
+        }
+
+    def unload_tables(
+        self, names: Optional[Iterable[str]] = None, keep: Iterable[str] = ()
+    ) -> List[str]:
+        """
+        Drop loaded tables to release memory, they are decoded again on next access.
+        Only available in lazy mode. Returns names of dropped tables.
+        """
+        if not self.lazy:
+            raise Exception("Tables can only be unloaded in lazy mode!")
+        keep = set(keep)
+        dropped = []
+        for name in self.loaded_tables if names is None else names:
+            if name not in index_tables:
+                raise ValueError(f"Unknown index table: {name}")
+            if name in keep or name not in self.__dict__:
+                continue
+            delattr(self, name)
+            dropped.append(name)
+        if dropped:
+            # derived tables keep references to dropped tables
+            for name in derived_tables:
+                self.__dict__.pop(name, None)
+        return dropped
 
     def get_avatar_info(self, id: str) -> Optional[AvatarInfo]:
         """
         Get avatar info by avatar id.
         """
-        if id not in self.avatars:
-            return None
-        return AvatarInfo(
-            id=id,
-            name=self.avatars[id].name,
-            icon=self.avatars[id].icon,
-        )
+        return self.static_info(self.avatar_infos.get(id))
 
     def get_path_info(self, id: str) -> Optional[PathInfo]:
         """
         Get path info by path id.
         """
-        if id in self.paths:
-            return PathInfo(id, self.paths[id].name, self.paths[id].icon)
-        return None
+        return self.static_info(self.path_infos.get(id))
 
     def get_element_info(self, id: str) -> Optional[ElementInfo]:
         """
         Get element info by element id.
         """
-        if id not in self.elements:
-            return None
-        return ElementInfo(
-            id, self.elements[id].name, self.elements[id].color, self.elements[id].icon
-        )
+        return self.static_info(self.element_infos.get(id))
 
-    def get_character_info(self, basic: CharacterBasicInfo) -> Optional[CharacterInfo]:
+    def get_character_info(
+        self,
+        basic: CharacterBasicInfo,
+        sections: Optional[Iterable[str]] = None,
+        numeric_only: bool = False,
+    ) -> Optional[CharacterInfo]:
         """
         Get character info by character basic info.
+
+        Caches and coalescing share infos between calls with equal basic infos, or
+        with the same build in any order in canonical mode.
+
+        With `sections` only those of `character_sections` are built, the others are
+        left empty. With `numeric_only` values are not formatted, display strings and
+        skill descs are empty except in the prebuilt relic set infos. Such partial
+        infos are always built without cache or coalescing.
+        """
+        flight = self.single_flight
+        if (
+            sections is not None
+            or numeric_only
+            or (self.info_cache is None and self.disk_cache is None and flight is None)
+        ):
+            if self.canonical:
+                basic = self.sort_character_basic(basic)
+            return self.create_character_info(basic, sections, numeric_only)
+        key, call = self.character_info_call(basic)
+        if flight is None:
+            return call()
+        return flight.do(key, call)
+
+    def character_info_call(
+        self, basic: CharacterBasicInfo
+    ) -> Tuple[bytes, Callable[[], Optional[CharacterInfo]]]:
+        """
+        Get cache and coalescing key of basic info and the call getting its info.
+        """
+        basic, key = self.character_info_key(basic)
+        if self.info_cache is None and self.disk_cache is None:
+            return key, partial(self.create_character_info, basic)
+        return key, partial(self.lookup_character_info, basic, key)
+
+    def character_info_key(
+        self, basic: CharacterBasicInfo
+    ) -> Tuple[CharacterBasicInfo, bytes]:
+        """
+        Get basic info to build from and its key, the hash of its exact encoding.
+        In canonical mode the basic info is sorted first.
+        """
+        if self.canonical:
+            basic = self.sort_character_basic(basic)
+        return basic, canonical_hash(basic)
+
+    def lookup_character_info(
+        self, basic: CharacterBasicInfo, key: bytes
+    ) -> Optional[CharacterInfo]:
+        """
+        Get character info by basic info and its key from `character_info_key`,
+        from caches if enabled, without coalescing.
+        """
+        cache = self.info_cache
+        disk = self.disk_cache
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                # kept encoded outside frozen mode, each caller gets its own info
+                return cached if self.frozen else self.info_decoder.decode(cached)
+        info = None
+        data = None
+        if disk is not None:
+            data = disk.get(self.content_hash, key)
+            if data is not None:
+                info = self.info_decoder.decode(data)
+        if info is None:
+            info = self.create_character_info(basic)
+            if info is None:
+                return None
+            if disk is not None:
+                data = info_encoder.encode(info)
+                disk.put(self.content_hash, key, data)
+        if cache is not None:
+            if data is None and (cache.maxbytes or not self.frozen):
+                data = info_encoder.encode(info)
+            size = len(data) if data is not None and cache.maxbytes else 0
+            cache.put(key, info if self.frozen else data, size)
+        return info
+
+    def get_character_infos(
+        self,
+        basics: Iterable[CharacterBasicInfo],
+        workers: Optional[int] = None,
+        chunksize: int = 64,
+        ordered: bool = True,
+        max_pending: Optional[int] = None,
+    ) -> Iterator[Any]:
+        """
+        Get character infos of many basic infos, in chunks on a pool of `workers`
+        processes which each load this index once, or in this process by default.
+
+        Infos are yielded in input order, or as `(position, info)` pairs in
+        completion order when not `ordered`. A failed item yields its exception in
+        place of the info instead of aborting the batch. Basic infos are read only
+        `max_pending` chunks ahead of consumed infos, twice the workers by default.
+        """
+        # checked here, the generator body only runs on first iteration
+        if chunksize < 1:
+            raise ValueError("Chunk size must be positive!")
+        if workers is not None and workers < 1:
+            raise ValueError("Worker count must be positive!")
+        if max_pending is not None and max_pending < 1:
+            raise ValueError("Pending chunk limit must be positive!")
+        return self.iter_character_infos(
+            basics, workers, chunksize, ordered, max_pending
+        )
+
+    def iter_character_infos(
+        self,
+        basics: Iterable[CharacterBasicInfo],
+        workers: Optional[int],
+        chunksize: int,
+        ordered: bool,
+        max_pending: Optional[int],
+    ) -> Iterator[Any]:
+        if workers is None:
+            for start, chunk in get_chunks(basics, chunksize):
+                infos = get_chunk_infos(self, chunk)
+                yield from infos if ordered else enumerate(infos, start)
+            return
+        with self.get_worker_pool(workers) as executor:
+            results = map_chunks(
+                executor,
+                encode_chunk_infos,
+                get_chunks(basics, chunksize),
+                max_pending if max_pending is not None else 2 * workers,
+                ordered,
+            )
+            for start, infos in results:
+                for position, info in enumerate(infos, start):
+                    if isinstance(info, bytes):
+                        info = self.info_decoder.decode(info)
+                    yield info if ordered else (position, info)
+
+    def get_worker_pool(self, workers: int) -> ProcessPoolExecutor:
         """
-        if basic.id not in self.characters:
+        Get process pool whose workers each load this index once.
+        """
+        args, kwargs = self.init_args
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_worker,
+            initargs=(type(self), args, kwargs),
+        )
+
+    def get_character_info_json(
+        self,
+        basic: CharacterBasicInfo,
+        buffer: Optional[bytearray] = None,
+        offset: int = 0,
+        sections: Optional[Iterable[str]] = None,
+        numeric_only: bool = False,
+    ) -> Union[bytes, bytearray, None]:
+        """
+        Get json encoded character info by character basic info.
+
+        With `buffer` the info is encoded into it from `offset` and the buffer is
+        returned, truncated after the info, so one buffer serves many responses.
+        """
+        info = self.get_character_info(basic, sections, numeric_only)
+        if info is None:
             return None
-        info = CharacterInfo(
-            id=basic.id,
-            rank=basic.rank,
-            level=basic.level,
-            promotion=basic.promotion,
-            name=self.characters[basic.id].name,
-            rarity=self.characters[basic.id].rarity,
-            icon=self.characters[basic.id].icon,
-            preview=self.characters[basic.id].preview,
-            portrait=self.characters[basic.id].portrait,
-            rank_icons=[
-                self.character_ranks[i].icon for i in self.characters[basic.id].ranks
-            ],
-            path=self.get_path_info(self.characters[basic.id].path),
-            element=self.get_element_info(self.characters[basic.id].element),
-            skills=self.get_character_skill_info(
-                basic.id,
-                self.merge_character_skill_upgrade(
-                    [
-                        self.get_character_skill_upgrade_from_rank(
-                            basic.id, basic.rank
-                        ),
-                        self.get_character_skill_upgrade_from_skill_tree(
-                            basic.id, basic.skill_tree_levels
-                        ),
-                    ]
-                ),
-            ),
-            skill_trees=self.fix_skill_tree_max_level(
-                self.get_character_skill_tree_info(basic.id, basic.skill_tree_levels),
-                self.get_character_skill_upgrade_from_rank(basic.id, basic.rank),
-            ),
-            light_cone=None,
-            relics=[],
-            relic_sets=[],
-            attributes=self.get_character_attribute_from_promotion(
-                basic.id, basic.promotion, basic.level
-            ),
-            additions=[],
-            properties=self.merge_property(
-                [
-                    self.get_character_property_from_skill_tree(
-                        basic.id, basic.skill_tree_levels
-                    )
-                ]
-            ),
+        return encode_info(json_encoder, info, buffer, offset)
+
+    def get_character_infos_json(
+        self,
+        basics: Iterable[CharacterBasicInfo],
+        buffer: Optional[bytearray] = None,
+        offset: int = 0,
+        sections: Optional[Iterable[str]] = None,
+        numeric_only: bool = False,
+    ) -> Union[bytes, bytearray]:
+        """
+        Get json array of character infos by character basic infos, `null` for
+        unknown characters. `buffer` is used as in `get_character_info_json`.
+        """
+        infos = [self.get_character_info(i, sections, numeric_only) for i in basics]
+        return encode_info(json_encoder, infos, buffer, offset)
+
+    def get_character_info_compact(
+        self,
+        basic: CharacterBasicInfo,
+        sections: Optional[Iterable[str]] = None,
+        numeric_only: bool = False,
+    ) -> Optional[CompactCharacterInfo]:
+        """
+        Get compact character info by character basic info.
+
+        Static names, icons and descs are left to `compact_dictionary`, which
+        clients fetch once per index version, `CompactDecoder` restores full infos.
+        """
+        info = self.get_character_info(basic, sections, numeric_only)
+        if info is None:
+            return None
+        return compact_character_info(info, numeric_only)
+
+    def get_character_info_msgpack(
+        self,
+        basic: CharacterBasicInfo,
+        buffer: Optional[bytearray] = None,
+        offset: int = 0,
+    ) -> Union[bytes, bytearray, None]:
+        """
+        Get msgpack encoded character info by character basic info, `buffer` is used
+        as in `get_character_info_json`.
+
+        With disk cache enabled, cached infos are returned as stored without decoding.
+        """
+        disk = self.disk_cache
+        if disk is None:
+            info = self.get_character_info(basic)
+            if info is None:
+                return None
+            return encode_info(info_encoder, info, buffer, offset)
+        basic, key = self.character_info_key(basic)
+        data = disk.get(self.content_hash, key)
+        if data is None:
+            info = self.create_character_info(basic)
+            if info is None:
+                return None
+            data = info_encoder.encode(info)
+            disk.put(self.content_hash, key, data)
+        if buffer is None:
+            return data
+        buffer[offset:] = data
+        return buffer
+
+    def create_character_info(
+        self,
+        basic: CharacterBasicInfo,
+        sections: Optional[Iterable[str]] = None,
+        numeric_only: bool = False,
+    ) -> Optional[CharacterInfo]:
+        """
+        Create character info by character basic info, without cache.
+        """
+        link = self.get_character_link(basic.id)
+        if link is None:
+            return None
+        want = character_sections if sections is None else set(sections)
+        for name in want:
+            if name not in character_sections:
+                raise ValueError(f"Unknown character info section: {name}")
+        display = not numeric_only
+        need_properties = "properties" in want or "additions" in want
+        need_attributes = "attributes" in want or "additions" in want
+        need_relic_sets = "relic_sets" in want or need_properties
+        need_relics = "relics" in want or need_relic_sets
+        need_light_cone = "light_cone" in want or need_attributes or need_properties
+        character = link.character
+        path = self.get_path_info(character.path)
+        skill_upgrade_from_rank = (
+            self.get_character_skill_upgrade_from_rank(basic.id, basic.rank)
+            if "skills" in want or "skill_trees" in want
+            else []
         )
-        # light cone
-        info.light_cone = (
-            self.get_light_cone_info(basic.light_cone) if basic.light_cone else None
+        light_cone = (
+            self.get_light_cone_info(basic.light_cone, display)
+            if basic.light_cone and need_light_cone
+            else None
         )
-        # relics
         relic_infos = (
-            (self.get_relic_info(relic) for relic in basic.relics)
-            if basic.relics
+            (self.get_relic_info(relic, display) for relic in basic.relics)
+            if basic.relics and need_relics
             else []
         )
-        info.relics = [
-            relic_info for relic_info in relic_infos if relic_info is not None
-        ]
-        # relic sets
-        info.relic_sets = self.get_relic_sets_info(info.relics) if info.relics else []
+        relics = [relic_info for relic_info in relic_infos if relic_info is not None]
+        # prebuilt bonuses, only copies are returned outside frozen mode
+        relic_set_bonuses = (
+            self.get_relic_set_bonuses(relics) if need_relic_sets else []
+        )
         # attributes
-        info.attributes = self.merge_attribute(
-            [
-                info.attributes,
-                info.light_cone.attributes if info.light_cone else [],
-            ]
+        attributes = (
+            self.merge_attribute(
+                [
+                    self.get_character_attribute_from_promotion(
+                        basic.id, basic.promotion, basic.level, display
+                    ),
+                    light_cone.attributes if light_cone else [],
+                ],
+                display,
+            )
+            if need_attributes
+            else []
         )
         # properties
-        relic_properties = []
-        for relic in info.relics:
-            if relic.main_affix:
-                relic_properties.append(relic.main_affix)
-            relic_properties += [
-                PropertyInfo(
-                    type=affix.type,
-                    field=affix.field,
-                    name=affix.name,
-                    icon=affix.icon,
-                    value=affix.value,
-                    display=affix.display,
-                    percent=affix.percent,
+        properties = []
+        if need_properties:
+            relic_properties = []
+            for relic in relics:
+                if relic.main_affix:
+                    relic_properties.append(relic.main_affix)
+                relic_properties += relic.sub_affix
+            for relic_set in relic_set_bonuses:
+                relic_properties += relic_set.properties
+            properties = self.merge_property(
+                [
+                    self.get_character_property_from_skill_tree(
+                        basic.id, basic.skill_tree_levels, display
+                    ),
+                    (
+                        light_cone.properties
+                        if (
+                            path
+                            and light_cone
+                            and light_cone.path
+                            and light_cone.path.id == path.id
+                        )
+                        else []
+                    ),
+                    relic_properties,
+                ],
+                display,
+            )
+        return self.CharacterInfo(
+            id=basic.id,
+            rank=basic.rank,
+            level=basic.level,
+            promotion=basic.promotion,
+            name=character.name,
+            rarity=character.rarity,
+            icon=character.icon,
+            preview=character.preview,
+            portrait=character.portrait,
+            rank_icons=(
+                [rank.icon for rank in link.ranks] if "rank_icons" in want else []
+            ),
+            path=path if "path" in want else None,
+            element=(
+                self.get_element_info(character.element) if "element" in want else None
+            ),
+            skills=(
+                self.get_character_skill_info(
+                    basic.id,
+                    self.merge_character_skill_upgrade(
+                        [
+                            skill_upgrade_from_rank,
+                            self.get_character_skill_upgrade_from_skill_tree(
+                                basic.id, basic.skill_tree_levels
+                            ),
+                        ]
+                    ),
+                    display,
                 )
-                for affix in relic.sub_affix
-            ]
-        for relic_set in info.relic_sets:
-            relic_properties += relic_set.properties
-        info.properties = self.merge_property(
-            [
-                info.properties,
-                (
-                    info.light_cone.properties
-                    if (
-                        info.path
-                        and info.light_cone
-                        and info.light_cone.path
-                        and info.light_cone.path.id == info.path.id
-                    )
-                    else []
-                ),
-                relic_properties,
-            ]
+                if "skills" in want
+                else []
+            ),
+            skill_trees=(
+                self.fix_skill_tree_max_level(
+                    self.get_character_skill_tree_info(
+                        basic.id, basic.skill_tree_levels
+                    ),
+                    skill_upgrade_from_rank,
+                )
+                if "skill_trees" in want
+                else []
+            ),
+            light_cone=light_cone if "light_cone" in want else None,
+            relics=relics if "relics" in want else [],
+            relic_sets=(
+                [self.static_info(i) for i in relic_set_bonuses]
+                if "relic_sets" in want
+                else []
+            ),
+            attributes=attributes if "attributes" in want else [],
+            additions=(
+                self.calculate_additions(attributes, properties, display)
+                if "additions" in want
+                else []
+            ),
+            properties=properties if "properties" in want else [],
         )
-        # additions
-        info.additions = self.calculate_additions(info.attributes, info.properties)
-        return info
 
-    def get_light_cone_info(self, basic: LightConeBasicInfo) -> Optional[LightConeInfo]:
+    def sort_character_basic(self, basic: CharacterBasicInfo) -> CharacterBasicInfo:
         """
-        Get light cone info by light cone basic info.
+        Sort skill trees of basic info by id and relics by type.
+        """
+        return sort_character_basic(basic, self.get_relic_order)
+
+    def get_relic_order(self, relic: RelicBasicInfo) -> Tuple[int, str]:
+        link = self.get_relic_link(relic.id)
+        return (link.type if link else 0, relic.id)
+
+    @memoized(
+        lambda basic, display=True: (
+            basic.id,
+            basic.rank,
+            basic.level,
+            basic.promotion,
+            display,
+        )
+    )
+    def get_light_cone_info(
+        self, basic: LightConeBasicInfo, display: bool = True
+    ) -> Optional[LightConeInfo]:
+        """
+        Get light cone info by light cone basic info, without display strings when
+        not `display`.
         """
         if basic.id not in self.light_cones:
             return None
-        info = LightConeInfo(
+        info = self.LightConeInfo(
             id=basic.id,
             rank=basic.rank,
             level=basic.level,
@@ -273,34 +1186,56 @@ class Index:
             preview=self.light_cones[basic.id].preview,
             portrait=self.light_cones[basic.id].portrait,
             attributes=self.get_light_cone_attribute_from_promotion(
-                basic.id, basic.promotion, basic.level
+                basic.id, basic.promotion, basic.level, display
             ),
             properties=self.merge_property(
-                [self.get_light_cone_property_from_rank(basic.id, basic.rank)]
+                [self.get_light_cone_property_from_rank(basic.id, basic.rank, display)],
+                display,
             ),
         )
         return info
 
-    def get_relic_info(self, basic: RelicBasicInfo) -> Optional[RelicInfo]:
-        if basic.id not in self.relics:
+    @memoized(lambda basic, display=True: (key_encoder.encode(basic), display))
+    def get_relic_info(
+        self, basic: RelicBasicInfo, display: bool = True
+    ) -> Optional[RelicInfo]:
+        link = self.get_relic_link(basic.id)
+        if link is None:
             return None
-        info = RelicInfo(
+        relic = link.relic
+        info = self.RelicInfo(
             id=basic.id,
-            name=self.relics[basic.id].name,
-            type=relic_type_map.get(self.relics[basic.id].type, 0),
-            set_id=self.relics[basic.id].set_id,
-            set_name=self.relic_sets[self.relics[basic.id].set_id].name,
-            rarity=self.relics[basic.id].rarity,
+            name=relic.name,
+            type=link.type,
+            set_id=relic.set_id,
+            set_name=link.set.name,
+            rarity=relic.rarity,
             level=basic.level,
-            icon=self.relics[basic.id].icon,
+            icon=relic.icon,
             main_affix=self.get_relic_main_affix(
-                basic.id, basic.level, basic.main_affix_id
+                basic.id, basic.level, basic.main_affix_id, display
             ),
-            sub_affix=self.get_relic_sub_affix(basic.id, basic.sub_affix_info),
+            sub_affix=self.get_relic_sub_affix(basic.id, basic.sub_affix_info, display),
         )
         return info
 
     def get_relic_sets_info(self, relics: List[RelicInfo]) -> List[RelicSetInfo]:
+        return [self.static_info(i) for i in self.get_relic_set_bonuses(relics)]
+
+    # internal methods
+
+    def static_info(self, info: T) -> T:
+        """
+        Prebuilt static info as is in frozen mode, otherwise a copy which callers
+        may modify without changing later results.
+        """
+        if info is None or self.frozen:
+            return info
+        if isinstance(info, RelicSetInfo):
+            return replace(info, properties=[replace(i) for i in info.properties])
+        return replace(info)
+
+    def get_relic_set_bonuses(self, relics: List[RelicInfo]) -> List[RelicSetInfo]:
         set_num: Dict[str, int] = {}
         for relic in relics:
             if relic.set_id not in set_num:
@@ -310,82 +1245,35 @@ class Index:
         relic_sets = []
         for k, v in set_num.items():
             if v >= 2:
-                relic_sets.append(
-                    RelicSetInfo(
-                        id=k,
-                        name=self.relic_sets[k].name,
-                        icon=self.relic_sets[k].icon,
-                        num=2,
-                        desc=self.relic_sets[k].desc[0],
-                        properties=[
-                            PropertyInfo(
-                                type=i.type,
-                                field=self.properties[i.type].field,
-                                name=self.properties[i.type].name,
-                                icon=self.properties[i.type].icon,
-                                value=i.value,
-                                display=self.value_display_format(
-                                    i.value,
-                                    self.properties[i.type].percent,
-                                ),
-                                percent=self.properties[i.type].percent,
-                            )
-                            for i in self.relic_sets[k].properties[0]
-                        ],
-                    )
-                )
+                relic_sets.append(self.relic_set_infos[k][0])
             if v >= 4:
-                relic_sets.append(
-                    RelicSetInfo(
-                        id=k,
-                        name=self.relic_sets[k].name,
-                        icon=self.relic_sets[k].icon,
-                        num=4,
-                        desc=(
-                            self.relic_sets[k].desc[1]
-                            if len(self.relic_sets[k].desc) > 1
-                            else ""
-                        ),
-                        properties=[
-                            PropertyInfo(
-                                type=i.type,
-                                field=self.properties[i.type].field,
-                                name=self.properties[i.type].name,
-                                icon=self.properties[i.type].icon,
-                                value=i.value,
-                                display=self.value_display_format(
-                                    i.value,
-                                    self.properties[i.type].percent,
-                                ),
-                                percent=self.properties[i.type].percent,
-                            )
-                            for i in (
-                                self.relic_sets[k].properties[1]
-                                if len(self.relic_sets[k].properties) > 1
-                                else []
-                            )
-                        ],
-                    )
-                )
+                relic_sets.append(self.relic_set_infos[k][1])
         return relic_sets
 
-    # internal methods
-
+    @memoized(
+        lambda id, levels, display=True: (
+            id,
+            tuple((i.id, i.level) for i in levels),
+            display,
+        )
+    )
     def get_character_skill_info(
-        self, id: str, skill_levels: List[LevelInfo]
+        self, id: str, skill_levels: List[LevelInfo], display: bool = True
     ) -> List[SkillInfo]:
         """
         Get character skill info by character id and skill levels.
         """
-        if id not in self.characters:
+        link = self.get_character_link(id)
+        if link is None:
             return []
         skill_info_dict = {}
         for skill_level in skill_levels:
-            if skill_level.id not in self.character_skills:
+            skill = link.skills.get(skill_level.id) or self.character_skills.get(
+                skill_level.id
+            )
+            if skill is None:
                 continue
-            skill = self.character_skills[skill_level.id]
-            params = skill.params[skill_level.level - 1] if skill.params else []
-            skill_info = SkillInfo(
+            skill_info = self.SkillInfo(
                 id=skill_level.id,
                 name=skill.name,
                 level=skill_level.level,
@@ -396,17 +1284,21 @@ class Index:
                 effect=skill.effect,
                 effect_text=skill.effect_text,
                 simple_desc=skill.simple_desc,
-                desc=self.format_template(skill.desc, params),
+                desc=(
+                    self.get_skill_desc(skill_level.id, skill_level.level)
+                    if display
+                    else ""
+                ),
                 icon=skill.icon,
             )
             skill_info_dict[skill_level.id] = skill_info
         skill_info_list = []
-        for skill_id in self.characters[id].skills:
+        for skill_id in link.character.skills:
             if skill_id in skill_info_dict:
                 skill_info_list.append(skill_info_dict[skill_id])
             else:
-                skill = self.character_skills[skill_id]
-                skill_info = SkillInfo(
+                skill = link.skills[skill_id]
+                skill_info = self.SkillInfo(
                     id=skill_id,
                     name=skill_id,
                     level=0,
@@ -423,129 +1315,145 @@ class Index:
                 skill_info_list.append(skill_info)
         return skill_info_list
 
+    def get_skill_desc(self, id: str, level: int) -> str:
+        """
+        Get rendered skill desc by skill id and level.
+        """
+        key = ("skill", id, level)
+        desc = self.desc_cache.get(key)
+        if desc is not None:
+            return desc
+        skill_descs = self.__dict__.get("skill_descs")
+        if skill_descs and id in skill_descs and 0 < level <= len(skill_descs[id]):
+            desc = skill_descs[id][level - 1]
+        else:
+            skill = self.character_skills[id]
+            params = skill.params[level - 1] if skill.params else []
+            desc = self.format_template(skill.desc, params)
+        self.desc_cache[key] = desc
+        return desc
+
+    def get_light_cone_rank_desc(self, id: str, rank: int) -> Optional[str]:
+        """
+        Get rendered light cone skill desc by light cone id and rank.
+        """
+        if id not in self.light_cone_ranks:
+            return None
+        if rank not in range(1, 5 + 1):  # 1-5
+            return None
+        key = ("light_cone", id, rank)
+        desc = self.desc_cache.get(key)
+        if desc is None:
+            light_cone_rank = self.light_cone_ranks[id]
+            params = (
+                light_cone_rank.params[rank - 1]
+                if len(light_cone_rank.params) >= rank
+                else []
+            )
+            desc = self.format_template(light_cone_rank.desc, params)
+            self.desc_cache[key] = desc
+        return desc
+
     def get_character_skill_tree_info(
         self, id: str, skill_tree_levels: List[LevelInfo]
     ) -> List[SkillTreeInfo]:
         """
         Get character skill tree info by character id and skill tree levels.
         """
-        if id not in self.characters:
+        link = self.get_character_link(id)
+        if link is None or not link.complete_skill_trees:
             return []
-        skill_tree_dict: Dict[str, int] = {}
-        for skill_tree in skill_tree_levels:
-            if skill_tree.id not in self.character_skill_trees:
-                continue
-            skill_tree_dict[skill_tree.id] = skill_tree.level
+        # only levels of the character's own skill trees are read
+        skill_tree_dict = {
+            skill_tree.id: skill_tree.level for skill_tree in skill_tree_levels
+        }
         skill_tree_info_list = []
-        for skill_tree_id in self.characters[id].skill_trees:
-            if skill_tree_id not in self.character_skill_trees:
-                return []
-            parsed_info = SkillTreeInfo(
+        for skill_tree_id in link.character.skill_trees:
+            skill_tree = link.skill_trees[skill_tree_id]
+            parsed_info = self.SkillTreeInfo(
                 id=skill_tree_id,
-                level=(
-                    skill_tree_dict[skill_tree_id]
-                    if skill_tree_id in skill_tree_dict
-                    else 0
-                ),
-                anchor=self.character_skill_trees[skill_tree_id].anchor,
-                max_level=self.character_skill_trees[skill_tree_id].max_level,
-                icon=self.character_skill_trees[skill_tree_id].icon,
-                parent=(
-                    self.character_skill_trees[skill_tree_id].pre_points[0]
-                    if self.character_skill_trees[skill_tree_id].pre_points
-                    else None
-                ),
+                level=skill_tree_dict.get(skill_tree_id, 0),
+                anchor=skill_tree.anchor,
+                max_level=skill_tree.max_level,
+                icon=skill_tree.icon,
+                parent=skill_tree.pre_points[0] if skill_tree.pre_points else None,
             )
             skill_tree_info_list.append(parsed_info)
         return skill_tree_info_list
 
     def get_character_attribute_from_promotion(
-        self, id: str, promotion: int, level: int
+        self, id: str, promotion: int, level: int, display: bool = True
     ) -> List[AttributeInfo]:
         """
         Get character attribute from promotion.
         """
-        if id not in self.character_promotions:
-            return []
-        if promotion not in range(0, 6 + 1):  # 0-6
-            return []
-        if level not in range(1, 80 + 1):  # 1-80
-            return []
-        attributes = []
-        for k, v in self.character_promotions[id].values[promotion].items():
-            property = None
-            for i in self.properties.values():
-                if i.field == k:
-                    property = i
-                    break
-            if property is None:
-                continue
-            attributes.append(
-                AttributeInfo(
-                    field=k,
-                    name=property.name,
-                    icon=property.icon,
-                    value=v.base + v.step * (level - 1),
-                    display=self.value_display_format(
-                        v.base + v.step * (level - 1), property.percent
-                    ),
-                    percent=property.percent,
-                )
-            )
-        return attributes
+        return self.get_attribute_from_curves(
+            self.character_curves, id, promotion, level, display
+        )
 
     def get_light_cone_attribute_from_promotion(
-        self, id: str, promotion: int, level: int
+        self, id: str, promotion: int, level: int, display: bool = True
     ) -> List[AttributeInfo]:
         """
         Get light cone attribute from promotion.
         """
-        if id not in self.light_cone_promotions:
-            return []
+        return self.get_attribute_from_curves(
+            self.light_cone_curves, id, promotion, level, display
+        )
+
+    def get_attribute_from_curves(
+        self,
+        curves: PromotionCurves,
+        id: str,
+        promotion: int,
+        level: int,
+        display: bool = True,
+    ) -> List[AttributeInfo]:
+        """
+        Get attribute from promotion curves.
+        """
         if promotion not in range(0, 6 + 1):  # 0-6
             return []
         if level not in range(1, 80 + 1):  # 1-80
             return []
         attributes = []
-        for k, v in self.light_cone_promotions[id].values[promotion].items():
-            property = None
-            for i in self.properties.values():
-                if i.field == k:
-                    property = i
-                    break
+        for k, v in curves.get_values(id, promotion, level):
+            property = self.field_properties.get(k)
             if property is None:
                 continue
             attributes.append(
-                AttributeInfo(
+                self.AttributeInfo(
                     field=k,
                     name=property.name,
                     icon=property.icon,
-                    value=v.base + v.step * (level - 1),
-                    display=self.value_display_format(
-                        v.base + v.step * (level - 1), property.percent
+                    value=v,
+                    display=(
+                        self.value_display_format(v, property.percent)
+                        if display
+                        else ""
                     ),
                     percent=property.percent,
                 )
             )
         return attributes
 
+    @memoized(lambda id, rank: (id, rank))
     def get_character_skill_upgrade_from_rank(
         self, id: str, rank: int
     ) -> List[LevelInfo]:
         """
         Get character skill upgrade from rank.
         """
-        if id not in self.characters:
+        link = self.get_character_link(id)
+        if link is None:
             return []
         if rank not in range(0, 6 + 1):  # 0-6
             return []
-        unlock_ranks = self.characters[id].ranks[:rank]
         skill_upgrades = []
-        for unlock_rank in unlock_ranks:
-            if unlock_rank in self.character_ranks:
-                skill_up_list = self.character_ranks[unlock_rank].level_up_skills
-                for skill_up in skill_up_list:
-                    skill_upgrades.append(LevelInfo(skill_up.id, skill_up.num))
+        for unlock_rank in link.ranks[:rank]:
+            if unlock_rank is not None:
+                for skill_up in unlock_rank.level_up_skills:
+                    skill_upgrades.append(self.LevelInfo(skill_up.id, skill_up.num))
         return skill_upgrades
 
     def get_character_skill_upgrade_from_skill_tree(
@@ -554,57 +1462,48 @@ class Index:
         """
         Get character skill upgrade from skill tree.
         """
-        if id not in self.characters:
+        link = self.get_character_link(id)
+        if link is None:
             return []
-        skill_trees = self.characters[id].skill_trees
         skill_upgrades = []
         for skill_tree in skill_tree_levels:
-            if (
-                skill_tree.id in skill_trees
-                and skill_tree.id in self.character_skill_trees
-            ):
-                skill_up_list = self.character_skill_trees[
-                    skill_tree.id
-                ].level_up_skills
-                for skill_up in skill_up_list:
+            skill_tree_type = link.skill_trees.get(skill_tree.id)
+            if skill_tree_type is not None:
+                for skill_up in skill_tree_type.level_up_skills:
                     skill_upgrades.append(
-                        LevelInfo(skill_up.id, skill_up.num * skill_tree.level)
+                        self.LevelInfo(skill_up.id, skill_up.num * skill_tree.level)
                     )
         return skill_upgrades
 
     def get_character_property_from_skill_tree(
-        self, id: str, skill_tree_levels: List[LevelInfo]
+        self, id: str, skill_tree_levels: List[LevelInfo], display: bool = True
     ) -> List[PropertyInfo]:
         """
         Get character property from skill tree.
         """
-        if id not in self.characters:
+        link = self.get_character_link(id)
+        if link is None:
             return []
-        skill_trees = self.characters[id].skill_trees
         properties = []
         for skill_tree in skill_tree_levels:
-            if (
-                skill_tree.id in skill_trees
-                and skill_tree.id in self.character_skill_trees
-            ):
-                property_list = (
-                    self.character_skill_trees[skill_tree.id]
-                    .levels[skill_tree.level - 1]
-                    .properties
-                )
+            skill_tree_type = link.skill_trees.get(skill_tree.id)
+            if skill_tree_type is not None:
+                property_list = skill_tree_type.levels[skill_tree.level - 1].properties
                 for i in property_list:
-                    if i.type not in self.properties:
+                    property = self.properties.get(i.type)
+                    if property is None:
                         continue
-                    property = self.properties[i.type]
                     properties.append(
-                        PropertyInfo(
+                        self.PropertyInfo(
                             type=i.type,
                             field=property.field,
                             name=property.name,
                             icon=property.icon,
                             value=i.value,
-                            display=self.value_display_format(
-                                i.value, property.percent
+                            display=(
+                                self.value_display_format(i.value, property.percent)
+                                if display
+                                else ""
                             ),
                             percent=property.percent,
                         )
@@ -612,7 +1511,7 @@ class Index:
         return properties
 
     def get_light_cone_property_from_rank(
-        self, id: str, rank: int
+        self, id: str, rank: int, display: bool = True
     ) -> List[PropertyInfo]:
         """
         Get light cone property from rank.
@@ -623,81 +1522,99 @@ class Index:
             return []
         properties = []
         for i in self.light_cone_ranks[id].properties[rank - 1]:
-            if i.type not in self.properties:
+            property = self.properties.get(i.type)
+            if property is None:
                 continue
-            property = self.properties[i.type]
             properties.append(
-                PropertyInfo(
+                self.PropertyInfo(
                     type=i.type,
                     field=property.field,
                     name=property.name,
                     icon=property.icon,
                     value=i.value,
-                    display=self.value_display_format(i.value, property.percent),
+                    display=(
+                        self.value_display_format(i.value, property.percent)
+                        if display
+                        else ""
+                    ),
                     percent=property.percent,
                 )
             )
         return properties
 
+    @memoized(
+        lambda id, level, main_affix_id, display=True: (
+            id,
+            level,
+            main_affix_id,
+            display,
+        )
+    )
     def get_relic_main_affix(
-        self, id: str, level: int, main_affix_id: Optional[str]
+        self,
+        id: str,
+        level: int,
+        main_affix_id: Optional[str],
+        display: bool = True,
     ) -> Optional[PropertyInfo]:
         """
         Get relic property from affix.
         """
-        if id not in self.relics:
+        link = self.get_relic_link(id)
+        if link is None:
             return None
         if not main_affix_id:
             return None
-        main_affix_group = self.relics[id].main_affix_id
-        if (
-            main_affix_group not in self.relic_main_affixes
-            or main_affix_id not in self.relic_main_affixes[main_affix_group].affixes
-        ):
+        if link.main_affixes is None:
             return None
-        affix = self.relic_main_affixes[main_affix_group].affixes[main_affix_id]
-        main_affix_info = PropertyInfo(
+        affix = link.main_affixes.affixes.get(main_affix_id)
+        if affix is None:
+            return None
+        property = self.properties[affix.property]
+        value = affix.base + affix.step * level
+        main_affix_info = self.PropertyInfo(
             type=affix.property,
-            field=self.properties[affix.property].field,
-            name=self.properties[affix.property].name,
-            icon=self.properties[affix.property].icon,
-            value=affix.base + affix.step * level,
-            display=self.value_display_format(
-                affix.base + affix.step * level,
-                self.properties[affix.property].percent,
+            field=property.field,
+            name=property.name,
+            icon=property.icon,
+            value=value,
+            display=(
+                self.value_display_format(value, property.percent) if display else ""
             ),
-            percent=self.properties[affix.property].percent,
+            percent=property.percent,
         )
         return main_affix_info
 
     def get_relic_sub_affix(
-        self, id: str, sub_affix_info: List[SubAffixBasicInfo]
+        self, id: str, sub_affix_info: List[SubAffixBasicInfo], display: bool = True
     ) -> List[SubAffixInfo]:
         """
         Get relic property from affix.
         """
-        if id not in self.relics:
-            return []
-        sub_affix_group = self.relics[id].sub_affix_id
-        if sub_affix_group not in self.relic_sub_affixes:
+        link = self.get_relic_link(id)
+        if link is None or link.sub_affixes is None:
             return []
+        affixes = link.sub_affixes.affixes
         properties = []
         for sub_affix in sub_affix_info:
-            if sub_affix.id not in self.relic_sub_affixes[sub_affix_group].affixes:
+            affix = affixes.get(sub_affix.id)
+            if affix is None:
                 continue
-            affix = self.relic_sub_affixes[sub_affix_group].affixes[sub_affix.id]
+            property = self.properties[affix.property]
+            value = affix.base * sub_affix.cnt + affix.step * sub_affix.step
             properties.append(
-                SubAffixInfo(
+                self.SubAffixInfo(
                     type=affix.property,
-                    field=self.properties[affix.property].field,
-                    name=self.properties[affix.property].name,
-                    icon=self.properties[affix.property].icon,
-                    value=affix.base * sub_affix.cnt + affix.step * sub_affix.step,
-                    display=self.value_display_format(
-                        affix.base * sub_affix.cnt + affix.step * sub_affix.step,
-                        self.properties[affix.property].percent,
+                    field=property.field,
+                    name=property.name,
+                    icon=property.icon,
+                    value=value,
+                    display=(
+                        self.value_display_format(value, property.percent)
+                        if display
+                        else ""
                     ),
-                    percent=self.properties[affix.property].percent,
+                    percent=property.percent,
                     count=sub_affix.cnt,
                     step=sub_affix.step,
                 )
@@ -713,53 +1630,80 @@ class Index:
         skill_tree_fixed: List[SkillTreeInfo] = []
         upgrade_dict = {v.id: v.level for v in upgrade_list}
         for item in skill_tree:
-            if item.id in self.character_skill_trees:
-                skill_up_list = self.character_skill_trees[item.id].level_up_skills
+            skill_tree_type = self.character_skill_trees.get(item.id)
+            if skill_tree_type is not None:
+                skill_up_list = skill_tree_type.level_up_skills
                 if skill_up_list and skill_up_list[0].id in upgrade_dict:
-                    item.max_level += upgrade_dict[skill_up_list[0].id]
+                    item = replace(
+                        item,
+                        max_level=item.max_level + upgrade_dict[skill_up_list[0].id],
+                    )
                 skill_tree_fixed.append(item)
         return skill_tree_fixed
 
     def calculate_additions(
-        self, attributes: List[AttributeInfo], properties: List[PropertyInfo]
+        self,
+        attributes: List[AttributeInfo],
+        properties: List[PropertyInfo],
+        display: bool = True,
     ) -> List[AttributeInfo]:
         """
         Calculate additions from attributes and properties.
         """
-        attribute_dict = {}
-        addition_dict = {}
+        slots = self.field_slots
+        size = len(slots)
+        # base attribute value by field slot, last one wins
+        bases: List[Optional[float]] = [None] * size
         for attribute in attributes:
-            if attribute.field not in addition_dict:
-                attribute_dict[attribute.field] = attribute.value
+            slot = slots.get(attribute.field)
+            if slot is None:
+                slot = self.get_slot(slots, attribute.field)
+            if slot >= size:
+                bases += [None] * (slot + 1 - size)
+                size = slot + 1
+            bases[slot] = attribute.value
+        values = [0.0] * size
+        added = [False] * size
+        order = []
         for property in properties:
-            if (
-                self.properties[property.type].ratio
-                and property.field in attribute_dict
-            ):
-                value = property.value * attribute_dict[property.field]
+            slot = slots.get(property.field)
+            if slot is None:
+                slot = self.get_slot(slots, property.field)
+            if slot >= size:
+                grow = slot + 1 - size
+                bases += [None] * grow
+                values += [0.0] * grow
+                added += [False] * grow
+                size = slot + 1
+            base = bases[slot]
+            if self.properties[property.type].ratio and base is not None:
+                value = property.value * base
             else:
                 value = property.value
-            if property.field not in addition_dict:
-                addition_dict[property.field] = value
+            if not added[slot]:
+                added[slot] = True
+                values[slot] = value
+                order.append((slot, property.field))
             else:
-                addition_dict[property.field] += value
+                values[slot] += value
         additions = []
-        for k, v in addition_dict.items():
-            property = None
-            for i in self.properties.values():
-                if i.field == k:
-                    property = i
-                    break
-            if property is None:
+        for slot, k in order:
+            property_type = self.field_properties.get(k)
+            if property_type is None:
                 continue
+            v = values[slot]
             additions.append(
-                AttributeInfo(
+                self.AttributeInfo(
                     field=k,
-                    name=property.name,
-                    icon=property.icon,
+                    name=property_type.name,
+                    icon=property_type.icon,
                     value=v,
-                    display=self.value_display_format(v, property.percent),
-                    percent=property.percent,
+                    display=(
+                        self.value_display_format(v, property_type.percent)
+                        if display
+                        else ""
+                    ),
+                    percent=property_type.percent,
                 )
             )
         return additions
@@ -777,85 +1721,110 @@ class Index:
                     skill_upgrade_dict[skill.id] = skill.level
                 else:
                     skill_upgrade_dict[skill.id] += skill.level
-        return [LevelInfo(id, level) for id, level in skill_upgrade_dict.items()]
+        return [self.LevelInfo(id, level) for id, level in skill_upgrade_dict.items()]
 
     def merge_attribute(
-        self, attributes: List[List[AttributeInfo]]
+        self, attributes: List[List[AttributeInfo]], display: bool = True
     ) -> List[AttributeInfo]:
         """
         Merge attributes.
         """
-        attribute_dict = {}
+        slots = self.field_slots
+        size = len(slots)
+        values = [0.0] * size
+        origins: List[Optional[AttributeInfo]] = [None] * size
+        order = []
         for attribute_list in attributes:
             for attribute in attribute_list:
-                if attribute.field not in attribute_dict:
-                    attribute_dict[attribute.field] = {}
-                    attribute_dict[attribute.field]["value"] = attribute.value
-                    attribute_dict[attribute.field]["origin"] = deepcopy(attribute)
+                slot = slots.get(attribute.field)
+                if slot is None:
+                    slot = self.get_slot(slots, attribute.field)
+                if slot >= size:
+                    values += [0.0] * (slot + 1 - size)
+                    origins += [None] * (slot + 1 - size)
+                    size = slot + 1
+                if origins[slot] is None:
+                    origins[slot] = attribute
+                    values[slot] = attribute.value
+                    order.append(attribute)
                 else:
-                    attribute_dict[attribute.field]["value"] += attribute.value
+                    values[slot] += attribute.value
         attribute_res = []
-        for v in attribute_dict.values():
-            attribute_info: AttributeInfo = v["origin"]
-            attribute_info.value = v["value"]
-            attribute_info.display = self.value_display_format(
-                v["value"], attribute_info.percent
+        for origin in order:
+            v = values[slots[origin.field]]
+            attribute_res.append(
+                self.AttributeInfo(
+                    field=origin.field,
+                    name=origin.name,
+                    icon=origin.icon,
+                    value=v,
+                    display=(
+                        self.value_display_format(v, origin.percent) if display else ""
+                    ),
+                    percent=origin.percent,
+                )
             )
-            attribute_res.append(attribute_info)
         return attribute_res
 
     def merge_property(
-        self, properties: List[List[PropertyInfo]]
+        self, properties: List[List[PropertyInfo]], display: bool = True
     ) -> List[PropertyInfo]:
         """
         Merge properties.
         """
-        property_dict = {}
+        slots = self.property_slots
+        size = len(slots)
+        values = [0.0] * size
+        origins: List[Optional[PropertyInfo]] = [None] * size
+        order = []
         for property_list in properties:
             for property in property_list:
-                if property.type not in property_dict:
-                    property_dict[property.type] = {}
-                    property_dict[property.type]["value"] = property.value
-                    property_dict[property.type]["origin"] = deepcopy(property)
+                slot = slots.get(property.type)
+                if slot is None:
+                    slot = self.get_slot(slots, property.type)
+                if slot >= size:
+                    values += [0.0] * (slot + 1 - size)
+                    origins += [None] * (slot + 1 - size)
+                    size = slot + 1
+                if origins[slot] is None:
+                    origins[slot] = property
+                    values[slot] = property.value
+                    order.append(property)
                 else:
-                    property_dict[property.type]["value"] += property.value
+                    values[slot] += property.value
         property_res = []
-        for v in property_dict.values():
-            property_info: PropertyInfo = v["origin"]
-            property_info.value = v["value"]
-            property_info.display = self.value_display_format(
-                v["value"], property_info.percent
+        for origin in order:
+            v = values[slots[origin.type]]
+            property_res.append(
+                self.PropertyInfo(
+                    type=origin.type,
+                    field=origin.field,
+                    name=origin.name,
+                    icon=origin.icon,
+                    value=v,
+                    display=(
+                        self.value_display_format(v, origin.percent) if display else ""
+                    ),
+                    percent=origin.percent,
+                )
             )
-            property_res.append(property_info)
         return property_res
 
+    def get_slot(self, slots: Dict[str, int], key: str) -> int:
+        """
+        Get slot of key, assigning a new one for keys unknown to the index.
+        """
+        with slot_lock:
+            return slots.setdefault(key, len(slots))
+
     def value_display_format(self, value: float, percent: bool) -> str:
         """
         Value display format.
         """
-        if percent:
-            return format(math.floor(value * 1000) / 10.0, ".1f") + "%"
-        else:
-            return f"{math.floor(value)}"
+        return display_format(value, percent)
 
     def format_template(self, template: str, params: List[float]) -> str:
         """
         Format string template with params.
         """
-        for n in range(1, 11):
-            if len(params) < n:
-                break
-            if f"#{n}[i]%" in template:
-                template = template.replace(
-                    f"#{n}[i]%", f"{math.floor(params[n-1]*100)}%"
-                )
-            if f"#{n}[i]" in template:
-                template = template.replace(f"#{n}[i]", f"{math.floor(params[n-1])}")
-            for f in range(1, 5):
-                if f"#{n}[f{f}]%" in template:
-                    value = format(params[n - 1] * 100, f".{f}f")
-                    template = template.replace(f"#{n}[f{f}]%", f"{value}%")
-                if f"#{n}[f{f}]" in template:
-                    value = format(params[n - 1], f".{f}f")
-                    template = template.replace(f"#{n}[f{f}]", f"{value}")
-        return template
+        return get_template(template).render(params)
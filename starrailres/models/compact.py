@@ -0,0 +1,154 @@
+from typing import Dict, List, Optional
+
+from msgspec import Struct
+
+from .info import ElementInfo, PathInfo, RelicSetInfo
+
+# per character payload, static data is referenced by id
+
+
+class CompactProperty(Struct, array_like=True, omit_defaults=True):
+    type: str
+    value: float
+
+
+class CompactSubAffix(Struct, array_like=True, omit_defaults=True):
+    type: str
+    value: float
+    count: int
+    step: int
+
+
+class CompactAttribute(Struct, array_like=True, omit_defaults=True):
+    field: str
+    value: float
+
+
+class CompactSkill(Struct, array_like=True, omit_defaults=True):
+    id: str
+    level: int
+    placeholder: bool = False  # skill without level info, named by its id
+
+
+class CompactSkillTree(Struct, array_like=True, omit_defaults=True):
+    id: str
+    level: int
+    max_level: int
+
+
+class CompactLightCone(Struct, array_like=True, omit_defaults=True):
+    id: str
+    rank: int
+    level: int
+    promotion: int
+    attributes: List[CompactAttribute] = []
+    properties: List[CompactProperty] = []
+
+
+class CompactRelic(Struct, array_like=True, omit_defaults=True):
+    id: str
+    level: int
+    main_affix: Optional[CompactProperty] = None
+    sub_affix: List[CompactSubAffix] = []
+
+
+class CompactRelicSet(Struct, array_like=True, omit_defaults=True):
+    id: str
+    num: int
+
+
+class CompactCharacterInfo(Struct, array_like=True, omit_defaults=True):
+    id: str
+    rank: int
+    level: int
+    promotion: int
+    path: Optional[str] = None
+    element: Optional[str] = None
+    skills: List[CompactSkill] = []
+    skill_trees: List[CompactSkillTree] = []
+    light_cone: Optional[CompactLightCone] = None
+    relics: List[CompactRelic] = []
+    relic_sets: List[CompactRelicSet] = []
+    attributes: List[CompactAttribute] = []
+    additions: List[CompactAttribute] = []
+    properties: List[CompactProperty] = []
+    pos: List[int] = []
+    rank_icons: bool = True
+    numeric_only: bool = False  # display strings and skill descs are empty
+
+
+# static data of one index version
+
+
+class PropertyEntry(Struct):
+    field: str
+    name: str
+    icon: Optional[str]
+    percent: bool
+
+
+class FieldEntry(Struct):
+    name: str
+    icon: Optional[str]
+    percent: bool
+
+
+class CharacterEntry(Struct):
+    name: str
+    rarity: int
+    icon: str
+    preview: str
+    portrait: str
+    rank_icons: List[str]
+
+
+class SkillEntry(Struct):
+    name: str
+    max_level: int
+    element: str
+    type: str
+    type_text: str
+    effect: str
+    effect_text: str
+    simple_desc: str
+    icon: Optional[str]
+    descs: List[str]  # by level
+
+
+class SkillTreeEntry(Struct):
+    anchor: str
+    max_level: int
+    icon: str
+    parent: Optional[str] = None
+
+
+class LightConeEntry(Struct):
+    name: str
+    rarity: int
+    icon: str
+    preview: str
+    portrait: str
+    path: str
+
+
+class RelicEntry(Struct):
+    name: str
+    type: int
+    set_id: str
+    set_name: str
+    rarity: int
+    icon: str
+
+
+class CompactDictionary(Struct):
+    hash: str
+    paths: Dict[str, PathInfo]
+    elements: Dict[str, ElementInfo]
+    properties: Dict[str, PropertyEntry]
+    fields: Dict[str, FieldEntry]
+    characters: Dict[str, CharacterEntry]
+    skills: Dict[str, SkillEntry]
+    skill_trees: Dict[str, SkillTreeEntry]
+    light_cones: Dict[str, LightConeEntry]
+    relics: Dict[str, RelicEntry]
+    relic_sets: Dict[str, List[RelicSetInfo]]  # 2 and 4 piece bonus
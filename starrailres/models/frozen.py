@@ -0,0 +1,165 @@
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    get_args,
+    get_origin,
+)
+
+import msgspec
+from msgspec import NODEFAULT, Struct, defstruct
+from msgspec.structs import fields, force_setattr
+
+from .info import (
+    AttributeInfo,
+    AvatarInfo,
+    CharacterInfo,
+    ElementInfo,
+    LevelInfo,
+    LightConeInfo,
+    PathInfo,
+    PropertyInfo,
+    RelicInfo,
+    RelicSetInfo,
+    SkillInfo,
+    SkillTreeInfo,
+    SubAffixInfo,
+)
+
+derived_types: Dict[Tuple[Type[Struct], bool, bool], Type[Struct]] = {}
+
+
+def derive(cls: Type[Struct], frozen: bool = False, gc: bool = True) -> Type[Struct]:
+    """
+    Get subclass of struct type with `frozen` and `gc` options, nested struct
+    types are derived too. Frozen structs hold tuples in place of lists and
+    read-only mappings in place of dicts, so they can not be changed at all.
+    Structs without gc are not tracked by the garbage collector, they must not be
+    part of reference cycles.
+    """
+    config = cls.__struct_config__
+    frozen = frozen or config.frozen
+    gc = gc and config.gc
+    if frozen == config.frozen and gc == config.gc:
+        return cls
+    key = (cls, frozen, gc)
+    if key not in derived_types:
+        struct_fields: List[Tuple[Any, ...]] = []
+        for field in fields(cls):
+            t = derive_type(field.type, frozen, gc)
+            if field.default is not NODEFAULT:
+                struct_fields.append((field.name, t, field.default))
+            elif field.default_factory is not NODEFAULT:
+                default = msgspec.field(default_factory=field.default_factory)
+                struct_fields.append((field.name, t, default))
+            else:
+                struct_fields.append((field.name, t))
+        namespace: Dict[str, Any] = {}
+        if frozen:
+            freezers = [
+                (field.name, freezer)
+                for field in fields(cls)
+                if (freezer := container_freezer(field.type)) is not None
+            ]
+            if freezers:
+                namespace["__post_init__"] = freeze_containers(freezers)
+        prefix = ("Frozen" if frozen else "") + ("" if gc else "Untracked")
+        derived_types[key] = defstruct(
+            f"{prefix}{cls.__name__}",
+            struct_fields,
+            bases=(cls,),
+            module=__name__,
+            namespace=namespace,
+            frozen=frozen,
+            gc=gc,
+        )
+    return derived_types[key]
+
+
+def derive_type(t: Any, frozen: bool = False, gc: bool = True) -> Any:
+    """
+    Replace struct types in type annotation with derived ones.
+    """
+    if isinstance(t, type) and issubclass(t, Struct):
+        return derive(t, frozen, gc)
+    origin = get_origin(t)
+    args = get_args(t)
+    if origin is list:
+        if frozen:
+            return Tuple[derive_type(args[0], frozen, gc), ...]
+        return List[derive_type(args[0], frozen, gc)]
+    if origin is dict:
+        return Dict[args[0], derive_type(args[1], frozen, gc)]
+    if origin is Union:
+        return Union[tuple(derive_type(arg, frozen, gc) for arg in args)]
+    return t
+
+
+def container_freezer(t: Any) -> Optional[Callable[[Any], Any]]:
+    """
+    Get function replacing lists with tuples and dicts with read-only mappings in
+    values of type annotation, None for types without containers.
+    """
+    origin = get_origin(t)
+    args = get_args(t)
+    if origin is list:
+        item = container_freezer(args[0])
+        if item is None:
+            return tuple
+        return lambda value: tuple(item(i) for i in value)
+    if origin is dict:
+        item = container_freezer(args[1])
+        if item is None:
+            return lambda value: MappingProxyType(dict(value))
+        return lambda value: MappingProxyType({k: item(v) for k, v in value.items()})
+    if origin is Union:
+        freezers = [f for f in map(container_freezer, args) if f is not None]
+        if not freezers:
+            return None
+        # optional container
+        return lambda value: value if value is None else freezers[0](value)
+    return None
+
+
+def freeze_containers(
+    freezers: List[Tuple[str, Callable[[Any], Any]]],
+) -> Callable[[Any], None]:
+    def __post_init__(self: Any) -> None:
+        for name, freezer in freezers:
+            force_setattr(self, name, freezer(getattr(self, name)))
+
+    return __post_init__
+
+
+def freeze(cls: Type[Struct]) -> Type[Struct]:
+    """
+    Get frozen subclass of struct type, nested struct types are frozen too.
+    """
+    return derive(cls, frozen=True)
+
+
+# frozen info types by name
+frozen_info_types: Dict[str, Type[Struct]] = {
+    cls.__name__: freeze(cls)
+    for cls in (
+        AttributeInfo,
+        AvatarInfo,
+        CharacterInfo,
+        ElementInfo,
+        LevelInfo,
+        LightConeInfo,
+        PathInfo,
+        PropertyInfo,
+        RelicInfo,
+        RelicSetInfo,
+        SkillInfo,
+        SkillTreeInfo,
+        SubAffixInfo,
+    )
+}
@@ -0,0 +1,31 @@
+from typing import Dict, List, Optional
+
+from msgspec import Struct
+
+from .characters import (
+    CharacterRankType,
+    CharacterSkillTreeType,
+    CharacterSkillType,
+    CharacterType,
+)
+from .relics import RelicMainAffixType, RelicSetType, RelicSubAffixType, RelicType
+
+
+class CharacterLink(Struct):
+    character: CharacterType
+    ranks: List[Optional[CharacterRankType]]  # by character ranks, None if missing
+    skills: Dict[str, CharacterSkillType]  # existing skills of character
+    skill_trees: Dict[str, CharacterSkillTreeType]  # existing skill trees
+    complete_skill_trees: bool  # all skill trees of character exist
+
+
+class RelicLink(Struct):
+    relic: RelicType
+    type: int  # relic type number
+    set: Optional[RelicSetType]
+    main_affixes: Optional[RelicMainAffixType]
+    sub_affixes: Optional[RelicSubAffixType]
+
+
+CharacterLinkIndex = Dict[str, CharacterLink]
+RelicLinkIndex = Dict[str, RelicLink]
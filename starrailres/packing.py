@@ -0,0 +1,86 @@
+import sys
+from array import array
+from types import MappingProxyType
+from typing import Any, Dict
+
+from msgspec import Struct
+from msgspec.structs import force_setattr
+
+# struct fields holding ids or property types, shared by many entries
+interned_fields = {
+    "id",
+    "type",
+    "tag",
+    "path",
+    "element",
+    "field",
+    "property",
+    "skill",
+    "set_id",
+    "affix_id",
+    "main_affix_id",
+    "sub_affix_id",
+    "anchor",
+}
+
+# struct fields holding lists of ids
+interned_lists = {"ranks", "skills", "skill_trees", "pre_points"}
+
+# struct fields holding rows of floats
+float_rows = {"params"}
+
+
+class TablePacker:
+    """
+    Shrink decoded tables in place, `pack` returns the table with mappings
+    rebuilt. Ids, property types and mapping keys are interned, equal non-zero
+    floats are shared and float rows become arrays.
+    """
+
+    def __init__(self) -> None:
+        self.floats: Dict[float, float] = {}
+
+    def pack(self, value: Any) -> Any:
+        if isinstance(value, Struct):
+            for name in value.__struct_fields__:
+                field = getattr(value, name)
+                if name in interned_fields and isinstance(field, str):
+                    packed: Any = sys.intern(field)
+                elif name in interned_lists and isinstance(field, (list, tuple)):
+                    packed = type(field)(sys.intern(i) for i in field)
+                elif name in float_rows and isinstance(field, (list, tuple)):
+                    packed = type(field)(array("d", i) for i in field)
+                else:
+                    packed = self.pack(field)
+                if packed is not field:
+                    # structs may be frozen
+                    force_setattr(value, name, packed)
+            return value
+        if isinstance(value, float):
+            # -0.0 and 0.0 are equal keys, zeros are not shared
+            return self.floats.setdefault(value, value) if value else value
+        if isinstance(value, list):
+            for i, item in enumerate(value):
+                packed = self.pack(item)
+                if packed is not item:
+                    value[i] = packed
+            return value
+        if isinstance(value, tuple):
+            # fields of frozen structs
+            return tuple(self.pack(i) for i in value)
+        if isinstance(value, (dict, MappingProxyType)):
+            table = {
+                (sys.intern(k) if isinstance(k, str) else k): self.pack(v)
+                for k, v in value.items()
+            }
+            return table if isinstance(value, dict) else MappingProxyType(table)
+        return value
+
+
+def encode_hook(value: Any) -> Any:
+    # float rows of packed tables, read-only mappings of frozen tables
+    if isinstance(value, array):
+        return value.tolist()
+    if isinstance(value, MappingProxyType):
+        return dict(value)
+    raise NotImplementedError(f"Objects of type {type(value)} are not supported")
@@ -0,0 +1,223 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from .cache import CacheStats
+
+# bump when encoded infos change, entries of other versions are not read
+DISK_CACHE_VERSION = 1
+
+schema = """
+CREATE TABLE IF NOT EXISTS infos (
+    hash TEXT NOT NULL,
+    key BLOB NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (hash, key)
+);
+CREATE INDEX IF NOT EXISTS infos_used ON infos (used);
+"""
+
+# hits recorded before last use times are written
+touch_batch = 256
+
+# eviction frees space down to this share of maxbytes
+evict_ratio = 0.9
+
+# seconds the cache is skipped after a database error
+error_backoff = 1.0
+
+
+def versioned(hash: str) -> str:
+    return f"{DISK_CACHE_VERSION}:{hash}"
+
+
+class DiskCache:
+    """
+    Persistent cache of encoded infos in a SQLite file, keyed by format version,
+    index content hash and basic info hash. Safe to share between threads and
+    processes. Database errors, e.g. locked by a long write of another process
+    after waiting `timeout` seconds, are counted in `errors` and treated as misses
+    or skipped puts, so callers compute the info instead. After an error the file
+    is not used for `error_backoff` seconds.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        maxbytes: Optional[int] = None,
+        timeout: float = 0.1,
+    ) -> None:
+        self.path = Path(path)
+        self.maxbytes = maxbytes
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(
+            str(self.path),
+            timeout=timeout,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(schema)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+        self.skip_until = 0.0
+        # last use of hit entries, written in batches
+        self.touched: Dict[Tuple[str, bytes], float] = {}
+        # local estimate, other processes may write too
+        self.bytes = self.total_bytes()
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # reopened by path, connections are not picklable
+        return (DiskCache, (self.path, self.maxbytes, self.timeout))
+
+    def total_bytes(self) -> int:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM infos"
+            ).fetchone()
+        return row[0]
+
+    def skipped(self) -> bool:
+        return self.skip_until > time.monotonic()
+
+    def failed(self) -> None:
+        self.errors += 1
+        self.skip_until = time.monotonic() + error_backoff
+
+    def get(self, hash: str, key: bytes) -> Optional[bytes]:
+        if self.skipped():
+            self.misses += 1
+            return None
+        hash = versioned(hash)
+        with self.lock:
+            try:
+                row = self.conn.execute(
+                    "SELECT value FROM infos WHERE hash = ? AND key = ?", (hash, key)
+                ).fetchone()
+            except sqlite3.Error:
+                self.failed()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.touched[(hash, key)] = time.time()
+            if len(self.touched) >= touch_batch:
+                self.flush_touched()
+            self.hits += 1
+            return row[0]
+
+    def flush_touched(self) -> None:
+        # caller holds the lock
+        if not self.touched:
+            return
+        try:
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE infos SET used = ? WHERE hash = ? AND key = ?",
+                    [(used, hash, key) for (hash, key), used in self.touched.items()],
+                )
+        except sqlite3.Error:
+            # use times are only a hint for eviction
+            self.failed()
+        self.touched.clear()
+
+    def put(self, hash: str, key: bytes, value: bytes) -> None:
+        size = len(value)
+        if (self.maxbytes is not None and size > self.maxbytes) or self.skipped():
+            return
+        hash = versioned(hash)
+        with self.lock:
+            try:
+                row = self.conn.execute(
+                    "SELECT size FROM infos WHERE hash = ? AND key = ?", (hash, key)
+                ).fetchone()
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO infos VALUES (?, ?, ?, ?, ?)",
+                    (hash, key, value, size, time.time()),
+                )
+            except sqlite3.Error:
+                self.failed()
+                return
+            # replaced entry no longer counts
+            self.bytes += size - (row[0] if row else 0)
+        if self.maxbytes is not None and self.bytes > self.maxbytes:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove least recently used entries until within `evict_ratio` of
+        `maxbytes`, so that following puts do not evict again right away.
+        """
+        if self.maxbytes is None:
+            return
+        try:
+            self.evict_entries(self.maxbytes)
+        except sqlite3.Error:
+            # retried on a later put
+            self.failed()
+
+    def evict_entries(self, maxbytes: int) -> None:
+        # once per eviction round, other processes may have written or evicted
+        self.bytes = self.total_bytes()
+        with self.lock:
+            if self.bytes <= maxbytes:
+                return
+            self.flush_touched()
+            excess = self.bytes - int(maxbytes * evict_ratio)
+            # walks the used index, only as far as needed
+            cursor = self.conn.execute("SELECT size FROM infos ORDER BY used")
+            count = 0
+            for (size,) in cursor:
+                if excess <= 0:
+                    break
+                count += 1
+                excess -= size
+                self.bytes -= size
+            cursor.close()
+            self.conn.execute(
+                "DELETE FROM infos WHERE rowid IN "
+                "(SELECT rowid FROM infos ORDER BY used LIMIT ?)",
+                (count,),
+            )
+            self.evictions += count
+
+    def clear(self, hash: Optional[str] = None) -> None:
+        """
+        Remove all entries, or only entries of index content `hash`.
+        """
+        with self.lock:
+            self.touched.clear()
+            if hash is None:
+                self.conn.execute("DELETE FROM infos")
+            else:
+                self.conn.execute(
+                    "DELETE FROM infos WHERE hash = ?", (versioned(hash),)
+                )
+        self.bytes = self.total_bytes()
+
+    def close(self) -> None:
+        with self.lock:
+            self.flush_touched()
+            self.conn.close()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM infos").fetchone()[0]
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            entries=len(self),
+            bytes=self.bytes,
+        )
@@ -0,0 +1,101 @@
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .index import Index, index_tables
+
+# tables without localized strings, loaded once for all languages
+neutral_tables: List[str] = [
+    "character_promotions",
+    "light_cone_promotions",
+    "relic_main_affixes",
+    "relic_sub_affixes",
+]
+
+# language neutral fields of localized tables, shared between languages
+neutral_fields: Dict[str, List[str]] = {
+    "characters": ["ranks", "skills", "skill_trees"],
+    "character_ranks": ["materials", "level_up_skills"],
+    "character_skills": ["params"],
+    "character_skill_trees": ["pre_points", "level_up_skills", "levels"],
+    "light_cone_ranks": ["params", "properties"],
+    "relics": ["set_id", "type", "main_affix_id", "sub_affix_id"],
+    "relic_sets": ["properties"],
+}
+
+
+class IndexRegistry:
+    """
+    Indexes of several languages sharing their language neutral data.
+
+    The first loaded language is the base, neutral tables of other languages are
+    taken from it and neutral fields of their localized tables point to the base
+    objects when equal, so only localized strings are kept per language.
+    """
+
+    def __init__(self, root: Path, languages: Optional[Iterable[str]] = None) -> None:
+        if not root.exists():
+            raise Exception("Please select an existing index root folder!")
+        self.root = root
+        self.indexes: Dict[str, Index] = {}
+        self.base: Dict[str, Any] = {}
+        if languages is None:
+            languages = sorted(
+                folder.name
+                for folder in root.iterdir()
+                if (folder / "characters.json").exists()
+            )
+        for language in languages:
+            self.load(language)
+
+    def __getitem__(self, language: str) -> Index:
+        if language not in self.indexes:
+            return self.load(language)
+        return self.indexes[language]
+
+    def __contains__(self, language: object) -> bool:
+        return language in self.indexes
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.indexes)
+
+    def __len__(self) -> int:
+        return len(self.indexes)
+
+    @property
+    def languages(self) -> List[str]:
+        """
+        Loaded languages.
+        """
+        return list(self.indexes)
+
+    def load(self, language: str) -> Index:
+        """
+        Load index of language, sharing neutral data with loaded languages.
+        """
+        index = Index(self.root / language, lazy=True)
+        for name in index_tables:
+            if name in neutral_tables and name in self.base:
+                setattr(index, name, self.base[name])
+                continue
+            table = index.load_table(name)
+            if name not in self.base:
+                self.base[name] = table
+            elif name in neutral_fields:
+                self.share_fields(table, self.base[name], neutral_fields[name])
+        self.indexes[language] = index
+        return index
+
+    def share_fields(
+        self, table: Dict[str, Any], base: Dict[str, Any], fields: List[str]
+    ) -> None:
+        """
+        Point equal fields of table entries to the base entries.
+        """
+        for id, entry in table.items():
+            base_entry = base.get(id)
+            if base_entry is None:
+                continue
+            for field in fields:
+                value = getattr(base_entry, field)
+                if getattr(entry, field) == value:
+                    setattr(entry, field, value)
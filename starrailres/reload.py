@@ -0,0 +1,123 @@
+import threading
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+from .compiled import index_hash
+from .index import Index, index_tables
+from .persistent import DiskCache
+
+
+class ReloadableIndex:
+    """
+    Index holder which reloads the index when its files change.
+
+    The new index is fully built before it replaces the current one with a single
+    reference assignment, so readers never lock: calls already running keep using
+    the old index and new calls use the new one. Methods and tables of the current
+    index are available on the holder directly.
+    """
+
+    def __init__(
+        self,
+        folder: Path,
+        check: str = "mtime",
+        interval: Optional[float] = None,
+        **options: Any,
+    ) -> None:
+        """
+        `check` is "mtime" to compare file mtimes and sizes or "hash" to compare
+        file contents, `options` are passed to `Index`. With `interval` files are
+        checked periodically in a background thread. A disk cache is opened once and
+        shared by all reloaded indexes.
+        """
+        if check not in ("mtime", "hash"):
+            raise ValueError(f"Unknown check method: {check}")
+        self.folder = folder
+        self.check = check
+        disk_cache = options.get("disk_cache")
+        if disk_cache is not None and not isinstance(disk_cache, DiskCache):
+            # one connection for all reloads, entries are keyed by content hash
+            options["disk_cache"] = DiskCache(
+                disk_cache, options.pop("disk_cache_bytes", None)
+            )
+        self.options = options
+        self.version = 0
+        self.error: Optional[Exception] = None
+        # serializes reloads, never taken by readers
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.signature = self.get_signature()
+        self.index = Index(folder, **options)
+        if interval:
+            self.start(interval)
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for missing attributes, delegate to current index
+        if "index" not in self.__dict__:
+            raise AttributeError(name)
+        return getattr(self.index, name)
+
+    def get_signature(self) -> Tuple[Any, ...]:
+        """
+        Get signature of index files, changes when files change.
+        """
+        files = [file for file, _ in index_tables.values()]
+        if self.check == "hash":
+            return (index_hash(self.folder, files),)
+        signature = []
+        for file in files:
+            stat = (self.folder / file).stat()
+            signature.append((file, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def changed(self) -> bool:
+        """
+        Check if index files changed since last load.
+        """
+        return self.get_signature() != self.signature
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Build new index if files changed and swap it in. Returns if reloaded.
+        """
+        with self.lock:
+            signature = self.get_signature()
+            if not force and signature == self.signature:
+                return False
+            index = Index(self.folder, **self.options)
+            self.index = index
+            self.signature = signature
+            self.version += 1
+            return True
+
+    def start(self, interval: float = 5.0) -> None:
+        """
+        Check files periodically in a background thread.
+        """
+        if self.thread is not None:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(
+            target=self.watch, args=(interval,), name="starrailres-reload", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop background checking.
+        """
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+
+    def watch(self, interval: float) -> None:
+        while not self.stop_event.wait(interval):
+            try:
+                self.reload()
+                self.error = None
+            except Exception as e:
+                # files may be half written, keep current index and retry
+                self.error = e
@@ -0,0 +1,169 @@
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple, get_args
+
+from msgspec import Struct
+from msgspec.msgpack import Decoder, encode
+
+from .index import Index, index_tables
+from .models.links import CharacterLink, RelicLink
+from .packing import encode_hook
+
+SHARED_MAGIC = b"SRRSHM01"
+
+# magic, header size
+shared_prefix = struct.Struct("<8sQ")
+
+# derived tables written to the file
+link_tables = {"character_links": CharacterLink, "relic_links": RelicLink}
+
+# links kept per thread, at most one info call worth
+recent_links = 8
+
+# small tables looked up in hot loops, always kept once decoded
+cached_tables = {"paths", "elements", "properties"}
+
+
+class SharedHeader(Struct):
+    hash: str  # content hash of source json files
+    tables: Dict[str, Dict[str, Tuple[int, int]]]  # table -> id -> (offset, size)
+
+
+class TableView(Mapping):
+    """
+    Read-only table backed by a shared buffer, entries are decoded on access.
+    """
+
+    def __init__(
+        self,
+        buffer: memoryview,
+        offsets: Dict[str, Tuple[int, int]],
+        decoder: Decoder,
+        cache: bool = False,
+    ) -> None:
+        self.buffer = buffer
+        self.offsets = offsets
+        self.decoder = decoder
+        self.cache = {} if cache else None
+
+    def __getitem__(self, key: str) -> Any:
+        if self.cache is not None and key in self.cache:
+            return self.cache[key]
+        offset, size = self.offsets[key]
+        value = self.decoder.decode(self.buffer[offset : offset + size])
+        if self.cache is not None:
+            self.cache[key] = value
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.offsets
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+
+def write_shared(index: Index, path: Path) -> None:
+    """
+    Write index to a file which can be attached by `SharedIndex`.
+    Put it on a memory backed filesystem such as `/dev/shm` to share it in RAM.
+    """
+    header = SharedHeader(hash=index.content_hash, tables={})
+    blobs = []
+    offset = 0
+    # resolved references too, attached indexes decode one entry per link
+    tables = {name: getattr(index, name) for name in index_tables}
+    tables["character_links"] = {
+        id: index.build_character_link(id) for id in index.characters
+    }
+    tables["relic_links"] = {id: index.build_relic_link(id) for id in index.relics}
+    for name, table in tables.items():
+        offsets = {}
+        for id, value in table.items():
+            blob = encode(value, enc_hook=encode_hook)
+            offsets[id] = (offset, len(blob))
+            blobs.append(blob)
+            offset += len(blob)
+        header.tables[name] = offsets
+    header_blob = encode(header)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(shared_prefix.pack(SHARED_MAGIC, len(header_blob)))
+        f.write(header_blob)
+        f.writelines(blobs)
+    os.replace(tmp, path)
+
+
+class SharedIndex(Index):
+    """
+    Index attached to a file written by `write_shared`.
+
+    The file is mapped read-only, so all processes attached to the same file share
+    its pages. Tables are `TableView` objects, entries are decoded on access and
+    only kept when `cache` is enabled. Entries of paths, elements and properties,
+    which info creation looks up many times per call, are always kept. Resolved
+    character and relic references are read from the file as well, so memory of a
+    worker does not grow with the characters it has served.
+    """
+
+    def __init__(self, path: Path, cache: bool = False) -> None:
+        if not path.exists():
+            raise Exception("Please select an existing shared index file!")
+        with open(path, "rb") as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self.mmap)
+        magic, header_size = shared_prefix.unpack_from(buffer)
+        if magic != SHARED_MAGIC:
+            raise Exception("Please select a valid shared index file!")
+        start = shared_prefix.size
+        header = Decoder(SharedHeader).decode(buffer[start : start + header_size])
+        data = buffer[start + header_size :]
+        self.setup(path, use_mmap=True)
+        self.recent = threading.local()
+        self.content_hash = header.hash
+        for name, (_, t) in index_tables.items():
+            decoder = Decoder(get_args(t)[1])
+            view = TableView(
+                data, header.tables[name], decoder, cache or name in cached_tables
+            )
+            setattr(self, name, view)
+        for name, t in link_tables.items():
+            if name in header.tables:
+                view = TableView(data, header.tables[name], Decoder(t), cache)
+                setattr(self, name, view)
+
+    def load_table(self, name: str) -> Any:
+        raise Exception("Tables of a shared index can not be reloaded!")
+
+    def get_character_link(self, id: str) -> Optional[CharacterLink]:
+        return self.get_recent_link("character", id)
+
+    def get_relic_link(self, id: str) -> Optional[RelicLink]:
+        return self.get_recent_link("relic", id)
+
+    def get_recent_link(self, kind: str, id: str) -> Any:
+        """
+        Get link, one info call looks up the same links several times, so the last
+        few links of each thread are kept.
+        """
+        links = self.recent.__dict__.setdefault("links", {})
+        key = (kind, id)
+        if key in links:
+            return links[key]
+        table = self.__dict__.get(f"{kind}_links")
+        if table is not None:
+            link = table.get(id)
+        elif kind == "character":
+            # file without links, resolved here
+            link = self.build_character_link(id) if id in self.characters else None
+        else:
+            link = self.build_relic_link(id) if id in self.relics else None
+        if len(links) >= recent_links:
+            links.clear()
+        links[key] = link
+        return link
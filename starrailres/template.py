@@ -0,0 +1,63 @@
+import math
+import re
+from functools import lru_cache
+from typing import List, Tuple, Union
+
+# parameter slot, e.g. "#1[i]%" or "#2[f1]"
+slot_pattern = re.compile(r"#([1-9][0-9]*)\[(i|f[1-4])\](%?)")
+
+# literal text or (param number, format, percent)
+Token = Union[str, Tuple[int, str, bool]]
+
+
+class Template:
+    """
+    Description template parsed into literal text and parameter slots.
+    """
+
+    def __init__(self, template: str) -> None:
+        self.tokens: List[Token] = []
+        self.max_param = 0
+        start = 0
+        for match in slot_pattern.finditer(template):
+            n = int(match.group(1))
+            if n > 10:  # only params 1-10 are filled
+                continue
+            if match.start() > start:
+                self.tokens.append(template[start : match.start()])
+            self.tokens.append((n, match.group(2), bool(match.group(3))))
+            self.max_param = max(self.max_param, n)
+            start = match.end()
+        if start < len(template) or not self.tokens:
+            self.tokens.append(template[start:])
+
+    def render(self, params: List[float]) -> str:
+        """
+        Fill slots with params, slots without param are kept as is.
+        """
+        if self.max_param == 0:
+            return self.tokens[0] if len(self.tokens) == 1 else "".join(self.tokens)
+        parts = []
+        for token in self.tokens:
+            if isinstance(token, str):
+                parts.append(token)
+                continue
+            n, f, percent = token
+            if n > len(params):
+                parts.append(f"#{n}[{f}]%" if percent else f"#{n}[{f}]")
+                continue
+            value = params[n - 1]
+            if f == "i":
+                text = f"{math.floor(value * 100 if percent else value)}"
+            else:
+                text = format(value * 100 if percent else value, f".{f[1]}f")
+            parts.append(text + "%" if percent else text)
+        return "".join(parts)
+
+
+@lru_cache(maxsize=4096)
+def get_template(template: str) -> Template:
+    """
+    Get parsed template, cached by template string.
+    """
+    return Template(template)
@@ -1,13 +1,179 @@
+import math
+import mmap
+import struct
+import tarfile
+import threading
+import zipfile
+from functools import lru_cache
 from pathlib import Path
-from typing import Type, TypeVar
+from typing import Any, Dict, Optional, Set, Tuple, Type, TypeVar, Union
 
-from msgspec.json import decode
+from msgspec.json import Decoder
 
 T = TypeVar("T")
 
+# zip local file header: signature ... file name length, extra field length
+zip_local_header = struct.Struct("<4s22xHH")
 
-def decode_json(path: Path, t: Type[T]) -> T:
+
+class Archive:
+    """
+    Zip or tar archive with random access to its members.
+
+    Stored zip members and members of uncompressed tar archives are read as slices
+    of the memory mapped archive, other members are decompressed on read.
+    """
+
+    def __init__(self, path: Path) -> None:
+        if not path.exists():
+            raise FileNotFoundError(path)
+        self.path = path
+        self.lock = threading.Lock()
+        self.zip: Optional[zipfile.ZipFile] = None
+        self.tar: Optional[tarfile.TarFile] = None
+        self.zip_members: Dict[str, zipfile.ZipInfo] = {}
+        self.tar_members: Dict[str, tarfile.TarInfo] = {}
+        self.compressed = True
+        if zipfile.is_zipfile(path):
+            self.zip = zipfile.ZipFile(path)
+            self.zip_members = {
+                member_name(i.filename): i
+                for i in self.zip.infolist()
+                if not i.is_dir()
+            }
+            files = list(self.zip_members)
+        elif tarfile.is_tarfile(path):
+            try:
+                self.tar = tarfile.open(path, "r:")
+                self.compressed = False
+            except tarfile.ReadError:
+                # compressed tar, member headers need a sequential scan
+                self.tar = tarfile.open(path, "r:*")
+            self.tar_members = {
+                member_name(m.name): m for m in self.tar.getmembers() if m.isfile()
+            }
+            files = list(self.tar_members)
+        else:
+            raise Exception("Please select a zip or tar archive!")
+        self.files: Set[str] = set(files)
+        self.dirs: Set[str] = {
+            file.rsplit("/", n)[0]
+            for file in files
+            for n in range(1, file.count("/") + 1)
+        }
+        self.mmap: Optional[mmap.mmap] = None
+        with open(path, "rb") as f:
+            if f.seek(0, 2) > 0:
+                self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # reopened by path, handles and maps are not picklable
+        return (Archive, (self.path,))
+
+    def read(self, name: str) -> Union[bytes, memoryview]:
+        """
+        Read archive member by name.
+        """
+        if name not in self.files:
+            raise FileNotFoundError(f"{self.path}/{name}")
+        if self.zip is not None:
+            info = self.zip_members[name]
+            if (
+                self.mmap is not None
+                and info.compress_type == zipfile.ZIP_STORED
+                and not info.flag_bits & 0x1  # encrypted
+            ):
+                _, name_size, extra_size = zip_local_header.unpack_from(
+                    self.mmap, info.header_offset
+                )
+                start = info.header_offset + zip_local_header.size
+                start += name_size + extra_size
+                return memoryview(self.mmap)[start : start + info.file_size]
+            with self.lock:
+                return self.zip.read(info)
+        assert self.tar is not None
+        member = self.tar_members[name]
+        if not self.compressed and self.mmap is not None:
+            start = member.offset_data
+            return memoryview(self.mmap)[start : start + member.size]
+        with self.lock:
+            f = self.tar.extractfile(member)
+            assert f is not None
+            return f.read()
+
+
+def member_name(name: str) -> str:
+    """
+    Archive member name without leading `./`, as written by `tar -C dir .`.
+    """
+    while name.startswith("./"):
+        name = name[2:]
+    return name
+
+
+class ArchivePath:
+    """
+    Path inside an archive, usable as index folder in place of `Path`.
+    """
+
+    def __init__(self, archive: Union[Path, Archive], name: str = "") -> None:
+        self.archive = archive if isinstance(archive, Archive) else Archive(archive)
+        self.name = name.strip("/")
+
+    def __truediv__(self, other: str) -> "ArchivePath":
+        name = f"{self.name}/{other}" if self.name else other
+        return ArchivePath(self.archive, name)
+
+    def __str__(self) -> str:
+        return f"{self.archive.path}/{self.name}"
+
+    def __repr__(self) -> str:
+        return f"ArchivePath({str(self)!r})"
+
+    def exists(self) -> bool:
+        return (
+            not self.name
+            or self.name in self.archive.files
+            or self.name in self.archive.dirs
+        )
+
+    def read_buffer(self) -> Union[bytes, memoryview]:
+        return self.archive.read(self.name)
+
+    def read_bytes(self) -> bytes:
+        return bytes(self.read_buffer())
+
+
+@lru_cache(maxsize=None)
+def get_decoder(t: Any) -> Decoder:
+    """
+    Get cached json decoder for type.
+    """
+    return Decoder(type=t)
+
+
+def decode_json(
+    path: Union[Path, ArchivePath], t: Type[T], use_mmap: bool = False
+) -> T:
     if not path.exists():
         raise FileNotFoundError(path)
-    with open(path, "r", encoding="utf-8") as f:
-        return decode(f.read(), type=t)
+    decoder = get_decoder(t)
+    if isinstance(path, ArchivePath):
+        return decoder.decode(path.read_buffer())
+    if use_mmap:
+        with open(path, "rb") as f:
+            # empty files can not be mapped
+            if f.seek(0, 2) > 0:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                    return decoder.decode(m)
+    return decoder.decode(path.read_bytes())
+
+
+def display_format(value: float, percent: bool) -> str:
+    """
+    Format value for display, as percent with one decimal or as integer.
+    """
+    if percent:
+        return format(math.floor(value * 1000) / 10.0, ".1f") + "%"
+    else:
+        return f"{math.floor(value)}"